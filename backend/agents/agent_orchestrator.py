@@ -203,7 +203,7 @@ class AgentOrchestrator:
     
     async def _execute_search_discovery(self, task_request: TaskRequest) -> Dict[str, Any]:
         """Execute search and discovery tasks using Pathway MCP server"""
-        from ..pathway_pipeline import hybrid_search, add_rule_text, add_contract_file, add_rule_file
+        from ..pathway_pipeline import async_hybrid_search, add_rule_text, add_contract_file, add_rule_file
         
         task_type = task_request.task_type
         params = task_request.parameters
@@ -215,7 +215,7 @@ class AgentOrchestrator:
             
             try:
                 # Call the actual Pathway function
-                search_results = hybrid_search(query, top_k)
+                search_results = await async_hybrid_search(query, top_k)
                 result = {
                     "success": True,
                     "query": query,
@@ -4,14 +4,28 @@ Enhanced compliance analysis with semantic understanding
 """
 
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from models.schemas import ComplianceFlag, Evidence, ContractField
 from landingai_client import extract_fields, extract_tables
 from retriever import retrieve
 from risk_correlation import risk_engine
+from analysis_context import AnalysisContext
+from indicator_matcher import AhoCorasick
 
 logger = logging.getLogger(__name__)
 
+class IndicatorMatch(NamedTuple):
+    """Where an indicator phrase comes from in compliance_rules"""
+    category: str
+    rule_name: str
+    indicator: str
+    positive: bool
+    # Index within the rule's indicator list, to report matches in rule order
+    position: int
+
+# (risk indicators found, positive indicators found) per (category, rule name)
+IndicatorHits = Dict[Tuple[str, str], Tuple[List[str], List[str]]]
+
 class AIComplianceChecker:
     """AI-powered compliance checker using LandingAI ADE and semantic analysis"""
     
@@ -87,15 +101,53 @@ class AIComplianceChecker:
                 }
             }
         }
+        # Every indicator of every rule in one automaton; rebuild after editing compliance_rules
+        self._indicator_matcher = self._compile_indicators()
+    
+    def _compile_indicators(self) -> AhoCorasick:
+        entries = []
+        for category, rules in self.compliance_rules.items():
+            for rule_name, rule_config in rules.items():
+                for positive, key in ((False, "risk_indicators"), (True, "positive_indicators")):
+                    for position, indicator in enumerate(rule_config.get(key, [])):
+                        entries.append((indicator, IndicatorMatch(category, rule_name, indicator, positive, position)))
+        return AhoCorasick(entries)
+    
+    def _scan_indicators(self, field_text: str) -> IndicatorHits:
+        """Scan field_text once and group the indicators found by rule."""
+        grouped: Dict[Tuple[str, str], Tuple[list, list]] = {}
+        for match in self._indicator_matcher.matches(field_text):
+            risk, positive = grouped.setdefault((match.category, match.rule_name), ([], []))
+            (positive if match.positive else risk).append((match.position, match.indicator))
+        return {key: ([i for _, i in sorted(risk)], [i for _, i in sorted(positive)])
+                for key, (risk, positive) in grouped.items()}
+    
+    def check_compliance_ai(self, fields: List[ContractField], region: str,
+                            context: Optional[AnalysisContext] = None,
+                            risk_correlations: Optional[List[Dict[str, Any]]] = None) -> List[ComplianceFlag]:
+        """AI-powered compliance checking using LandingAI ADE and semantic analysis
+        
+        Pass the request's AnalysisContext so later checkers reuse its retrievals.
+        """
+        return self.check_compliance_with_correlations(fields, region, context, risk_correlations)[0]
     
-    def check_compliance_ai(self, fields: List[ContractField], region: str) -> List[ComplianceFlag]:
-        """AI-powered compliance checking using LandingAI ADE and semantic analysis"""
+    def check_compliance_with_correlations(self, fields: List[ContractField], region: str,
+                                           context: Optional[AnalysisContext] = None,
+                                           risk_correlations: Optional[List[Dict[str, Any]]] = None
+                                           ) -> Tuple[List[ComplianceFlag], List[Dict[str, Any]]]:
+        """check_compliance_ai that also returns the risk correlations it used
+        
+        Correlations already computed for these fields can be passed in and are not recomputed.
+        """
         
         flags = []
+        retrieve_rules = context.retrieve if context is not None else retrieve
         processed_combinations = set()  # Track processed field-rule combinations
         
         # Get region-specific rule categories
         region_categories = self._get_region_specific_categories(region)
+        # Each field's text is scanned once; every rule's verdict reads from these hits
+        field_hits = [self._scan_indicators(f"{field.name} {field.value}") for field in fields]
         
         # Only apply rules relevant to the selected region
         for category in region_categories:
@@ -107,17 +159,19 @@ class AIComplianceChecker:
             if not region_specific_rules:
                 continue
                 
-            rule_hits = retrieve(category, region, top_k=3)
+            rule_hits = retrieve_rules(category, region, top_k=3)
             if not rule_hits:
                 continue
                 
             # Analyze each field against AI-enhanced rules (avoid duplicates)
-            for field in fields:
-                field_flags = self._analyze_field_ai_unique(field, category, region_specific_rules, rule_hits, region, processed_combinations)
+            for field, hits in zip(fields, field_hits):
+                field_flags = self._analyze_field_ai_unique(field, category, region_specific_rules, rule_hits, region,
+                                                            processed_combinations, hits)
                 flags.extend(field_flags)
         
         # Add AI-powered risk correlation analysis
-        risk_correlations = risk_engine.analyze_cross_document_risks(fields, region)
+        if risk_correlations is None:
+            risk_correlations = risk_engine.analyze_cross_document_risks(fields, region, context=context)
         for correlation in risk_correlations:
             if correlation.get("risk_level") in ["HIGH", "MEDIUM"]:
                 flags.append(ComplianceFlag(
@@ -130,7 +184,7 @@ class AIComplianceChecker:
                     rule_evidence=Evidence(file="ai_engine", section="correlation_analysis")
                 ))
         
-        return flags
+        return flags, risk_correlations
     
     def _filter_rules_by_region(self, rules: Dict, region: str) -> Dict:
         """Filter rules to only include those applicable to the specified region"""
@@ -171,14 +225,13 @@ class AIComplianceChecker:
             return ["privacy", "labor", "tax"]
     
     def _analyze_field_ai_unique(self, field: ContractField, category: str, rules: Dict, 
-                                 rule_hits: List[Tuple], region: str, processed_combinations: set) -> List[ComplianceFlag]:
+                                 rule_hits: List[Tuple], region: str, processed_combinations: set,
+                                 indicator_hits: Optional[IndicatorHits] = None) -> List[ComplianceFlag]:
         """AI-powered analysis of a single field with duplicate prevention"""
         
         flags = []
-        field_text = f"{field.name} {field.value}".lower()
-        
-        # Get the most relevant rule text
-        rule_text = rule_hits[0][0] if rule_hits else ""
+        if indicator_hits is None:
+            indicator_hits = self._scan_indicators(f"{field.name} {field.value}")
         
         # Analyze against each rule type (only once per field-category combination)
         for rule_name, rule_config in rules.items():
@@ -189,7 +242,7 @@ class AIComplianceChecker:
                 
             processed_combinations.add(combination_key)
             
-            analysis = self._semantic_analysis(field_text, rule_text, rule_config)
+            analysis = self._semantic_analysis(indicator_hits.get((category, rule_name), ([], [])), rule_config)
             
             if analysis["has_issues"]:
                 flags.append(ComplianceFlag(
@@ -209,14 +262,11 @@ class AIComplianceChecker:
         """AI-powered analysis of a single field (legacy method)"""
         
         flags = []
-        field_text = f"{field.name} {field.value}".lower()
-        
-        # Get the most relevant rule text
-        rule_text = rule_hits[0][0] if rule_hits else ""
+        indicator_hits = self._scan_indicators(f"{field.name} {field.value}")
         
         # Analyze against each rule type
         for rule_name, rule_config in rules.items():
-            analysis = self._semantic_analysis(field_text, rule_text, rule_config)
+            analysis = self._semantic_analysis(indicator_hits.get((category, rule_name), ([], [])), rule_config)
             
             if analysis["has_issues"]:
                 flags.append(ComplianceFlag(
@@ -231,20 +281,10 @@ class AIComplianceChecker:
         
         return flags
     
-    def _semantic_analysis(self, field_text: str, rule_text: str, rule_config: Dict) -> Dict[str, Any]:
-        """Perform semantic analysis of field against rule"""
-        
-        # Check for risk indicators
-        risk_indicators_found = []
-        for indicator in rule_config.get("risk_indicators", []):
-            if indicator.lower() in field_text:
-                risk_indicators_found.append(indicator)
+    def _semantic_analysis(self, indicators_found: Tuple[List[str], List[str]], rule_config: Dict) -> Dict[str, Any]:
+        """Perform semantic analysis of field against rule, given the (risk, positive) indicators found in it"""
         
-        # Check for positive indicators
-        positive_indicators_found = []
-        for indicator in rule_config.get("positive_indicators", []):
-            if indicator.lower() in field_text:
-                positive_indicators_found.append(indicator)
+        risk_indicators_found, positive_indicators_found = indicators_found
         
         # Determine risk level and explanation
         if risk_indicators_found and not positive_indicators_found:
@@ -0,0 +1,64 @@
+"""
+Per-request analysis context
+One AnalysisContext is created per API request and passed through the
+checkers, so rule retrievals, searches and other derived results computed
+by one component are reused by the next instead of being recomputed
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pathway_pipeline import fusion_depth, hybrid_search
+from query_cache import normalize_query
+from retriever import retrieve
+
+
+class AnalysisContext:
+    """Request-scoped memo of retrieve / hybrid_search results"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (key, fusion depth) -> (largest top_k fetched so far, its results)
+        self._retrievals: Dict[Tuple[Hashable, int], Tuple[int, List[Tuple[str, float]]]] = {}
+        self._searches: Dict[Tuple[Hashable, int], Tuple[int, List[Tuple[str, float]]]] = {}
+        self._memo: Dict[Hashable, Any] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _lookup(self, table: Dict, key: Hashable, top_k: int,
+                fetch: Callable[[], List[Tuple[str, float]]]) -> List[Tuple[str, float]]:
+        # Fusion ranks max(2 * top_k, SEARCH_FUSION_DEPTH) candidates per leg, so
+        # only a deeper result list fetched at the same depth has the same prefix
+        key = (key, fusion_depth(top_k))
+        with self._lock:
+            cached = table.get(key)
+            if cached is not None and cached[0] >= top_k:
+                self.stats["hits"] += 1
+                return cached[1][:top_k]
+            self.stats["misses"] += 1
+        results = fetch()
+        with self._lock:
+            cached = table.get(key)
+            if cached is None or cached[0] < top_k:
+                table[key] = (top_k, results)
+        return results[:top_k]
+
+    def retrieve(self, category: str, region: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """retriever.retrieve, memoized by (category, region) at the largest top_k per fusion depth."""
+        return self._lookup(self._retrievals, (category, region.upper()), top_k,
+                            lambda: retrieve(category, region, top_k=top_k))
+
+    def search(self, query: str, top_k: int = 3, region: Optional[str] = None) -> List[Tuple[str, float]]:
+        """hybrid_search, memoized by (normalized query, region) at the largest top_k per fusion depth."""
+        key = (normalize_query(query), region.upper() if region else None)
+        return self._lookup(self._searches, key, top_k,
+                            lambda: hybrid_search(query, top_k=top_k, region=region))
+
+    def memoize(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Compute a derived result once per request (e.g. risk correlations)."""
+        with self._lock:
+            if key in self._memo:
+                self.stats["hits"] += 1
+                return self._memo[key]
+            self.stats["misses"] += 1
+        value = compute()
+        with self._lock:
+            return self._memo.setdefault(key, value)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Form
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from pathlib import Path
 import json
@@ -25,6 +26,8 @@ from risk_correlation import risk_engine
 from config import Config
 from data_anonymizer import anonymizer
 from smart_document_corrector import smart_corrector
+from analysis_context import AnalysisContext
+from batch_extraction import batch_extractor
 
 APP_TITLE = "Global Compliance Copilot API"
 app = FastAPI(title=APP_TITLE)
@@ -70,6 +73,16 @@ def _latest_contract() -> Optional[Path]:
     pdfs.sort(key=lambda p: p.stat().st_mtime, reverse=True)
     return pdfs[0]
 
+def _write_fields_json(path: str, fields: List[ContractField]) -> None:
+    # The JSON sidecar, not the uploaded PDF, is what gets indexed for contract search
+    out_json = Path(path).with_suffix(".json")
+    with out_json.open("w", encoding="utf-8") as f:
+        json.dump([f_.model_dump() for f_ in fields], f, ensure_ascii=False, indent=2)
+    try:
+        add_contract_file(str(out_json))
+    except Exception:
+        pass
+
 # ---------- Health ----------
 @app.get("/health")
 def health():
@@ -79,32 +92,40 @@ def health():
 @app.post("/upload_rule")
 async def upload_rule(file: UploadFile = File(...)) -> dict:
     path = _save_upload(file, RULES_DIR)
+    # Indexes the file and records its text in the rules store under its path
     try:
         add_rule_file(str(path))
     except Exception:
         pass
-    # Always add to in-memory rules store for immediate compliance checking
-    try:
-        content = path.read_text(errors="ignore")
-        add_rule_text(content)
-    except Exception:
-        pass
     return {"ok": True, "path": str(path)}
 
 # ---------- Upload contract (file) ----------
 @app.post("/upload_contract")
 async def upload_contract(file: UploadFile = File(...)) -> dict:
     path = _save_upload(file, CONTRACTS_DIR)
-    try:
-        add_contract_file(str(path))
-    except Exception:
-        pass
     fields: List[ContractField] = extract_fields(str(path))
-    out_json = path.with_suffix(".json")
-    with out_json.open("w", encoding="utf-8") as f:
-        json.dump([f_.model_dump() for f_ in fields], f, ensure_ascii=False, indent=2)
+    _write_fields_json(str(path), fields)
     return {"ok": True, "path": str(path), "fields": [f_.model_dump() for f_ in fields]}
 
+# ---------- Batch contract extraction ----------
+@app.post("/batch_extract")
+async def batch_extract(files: List[UploadFile] = File(...)) -> dict:
+    """Save the uploaded contracts and extract them in the background; poll /batch_extract/{job_id}"""
+    paths = [str(_save_upload(file, CONTRACTS_DIR)) for file in files]
+    job = batch_extractor.submit(paths, on_result=_write_fields_json)
+    return {"ok": True, "job_id": job.id, "documents": len(paths)}
+
+@app.get("/batch_extract")
+def list_batch_jobs() -> dict:
+    return {"jobs": batch_extractor.list_jobs()}
+
+@app.get("/batch_extract/{job_id}")
+def batch_extract_status(job_id: str, include_fields: bool = False) -> dict:
+    job = batch_extractor.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown batch job")
+    return job.to_dict(include_fields=include_fields)
+
 # ---------- Check + Explain ----------
 @app.get("/check", response_model=List[ComplianceFlag])
 def run_check(
@@ -121,11 +142,14 @@ def run_check(
             raise HTTPException(status_code=400, detail="no contracts uploaded")
     fields = extract_fields(str(cpath))
     
+    # Both checkers share one context so each rule category is retrieved once per request
+    context = AnalysisContext()
+    
     # Use AI-powered compliance checking
-    flags = ai_compliance_checker.check_compliance_ai(fields, region)
+    flags = ai_compliance_checker.check_compliance_ai(fields, region, context=context)
     
     # Also run traditional checking for comparison
-    traditional_flags = check(fields, region)
+    traditional_flags = check(fields, region, context=context)
     
     # Combine results (AI flags take precedence)
     all_flags = flags + [f for f in traditional_flags if not any(af.id == f.id for af in flags)]
@@ -179,13 +203,9 @@ def get_rule(name: str) -> dict:
     if not p.exists():
         raise HTTPException(status_code=404, detail="rule not found")
     if p.suffix.lower() == ".pdf":
-        try:
-            from pypdf import PdfReader
-            text = ""
-            for pg in PdfReader(str(p)).pages:
-                text += pg.extract_text() or ""
-        except Exception:
-            text = ""
+        # Served from the per-page text cache after the first extraction
+        from pathway_pipeline import get_pdf_text_cache
+        text = get_pdf_text_cache().text(p)
     else:
         text = p.read_text(encoding="utf-8", errors="ignore")
     return {"name": name, "text": text}
@@ -335,7 +355,8 @@ async def smart_analyze_document_with_claude(
     
     try:
         # First get the simplified analysis results (Claude-generated flags)
-        simplified_result = simplified_engine.analyze_document(str(cpath), region, "general")
+        # The analysis is synchronous (rule search, extraction), so keep it off the event loop
+        simplified_result = await run_in_threadpool(simplified_engine.analyze_document, str(cpath), region, "general")
         
         # Use the simplified analysis results to generate smart corrections
         smart_corrections = smart_corrector._generate_corrections_from_simplified_analysis(simplified_result, region)
@@ -618,7 +639,8 @@ def search_pathway(
 def get_pathway_stats():
     """Get Pathway server statistics"""
     try:
-        from pathway_pipeline import get_live_document_count, get_recent_changes
+        from pathway_pipeline import get_live_document_count, get_recent_changes, get_search_stats
+        from pathway_client import pathway_client
         import time
         
         # Get real-time document count
@@ -627,14 +649,22 @@ def get_pathway_stats():
         # Get recent changes
         recent_changes = get_recent_changes()
         
+        # Last probe of the retrieval server (refreshed in the background), so polls never wait on it
+        probe = pathway_client.last_probe()
+        
         return {
             "server_running": True,
+            "pathway_server_reachable": probe["reachable"],
+            "pathway_server_statistics": probe["statistics"],
+            "pathway_last_probe": probe["probed_at"],
+            "pathway_breaker_state": probe["breaker_state"],
             "document_count": doc_count,
             "recent_changes": len(recent_changes),
             "last_indexed": time.strftime("%Y-%m-%d %H:%M:%S"),
             "port": 8765,
             "status": "active",
-            "live_monitoring": True
+            "live_monitoring": True,
+            "search_stats": get_search_stats()
         }
     except Exception as e:
         return {
@@ -685,18 +715,17 @@ def add_document_live(
 ):
     """Add a new document to the live index"""
     try:
-        from pathway_pipeline import add_rule_text, add_contract_file
+        from pathway_pipeline import add_rule_file, add_contract_file
         from pathlib import Path
         import time
         
         if doc_type == "rule":
-            # Add to rules
-            add_rule_text(content)
-            # Save to file
+            # Save to file, then index it under its path so re-adding replaces it
             rules_dir = Path("backend/rules")
             rules_dir.mkdir(exist_ok=True)
             file_path = rules_dir / filename
             file_path.write_text(content)
+            add_rule_file(str(file_path))
         else:
             # Add to contracts
             contracts_dir = Path("backend/contracts")
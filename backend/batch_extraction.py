@@ -0,0 +1,163 @@
+"""
+Batch contract extraction
+A batch job runs landingai_client.extract_fields over many documents on a
+bounded thread pool; ADE requests share the client's token-bucket quota, and
+rate-limit (429) / server (5xx) / network failures are retried with
+exponential backoff. Each document carries its own status
+"""
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from models.schemas import ContractField
+from landingai_client import AdeExtractionError, extract_fields
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Document states, in order
+QUEUED, RUNNING, RETRYING, DONE, FAILED = "queued", "running", "retrying", "done", "failed"
+
+
+class BatchJob:
+    """Status of one submitted batch; documents are updated in place by the workers"""
+
+    def __init__(self, paths: List[str]):
+        self.id = uuid.uuid4().hex
+        self.created_at = datetime.now().isoformat()
+        self.documents: List[Dict[str, Any]] = [
+            {"path": path, "status": QUEUED, "attempts": 0, "error": None, "fields": None,
+             "started_at": None, "finished_at": None}
+            for path in paths
+        ]
+        self._lock = threading.Lock()
+
+    def update(self, index: int, **changes: Any) -> None:
+        with self._lock:
+            self.documents[index].update(changes)
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            return all(d["status"] in (DONE, FAILED) for d in self.documents)
+
+    def to_dict(self, include_fields: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            documents = []
+            for d in self.documents:
+                doc = {k: v for k, v in d.items() if k != "fields"}
+                doc["field_count"] = len(d["fields"]) if d["fields"] is not None else None
+                if include_fields:
+                    doc["fields"] = d["fields"]
+                documents.append(doc)
+        counts = {state: 0 for state in (QUEUED, RUNNING, RETRYING, DONE, FAILED)}
+        for doc in documents:
+            counts[doc["status"]] += 1
+        return {
+            "job_id": self.id,
+            "created_at": self.created_at,
+            "total": len(documents),
+            "counts": counts,
+            "finished": counts[DONE] + counts[FAILED] == len(documents),
+            "documents": documents,
+        }
+
+
+class BatchExtractor:
+    """Runs batch jobs on a shared pool of `concurrency` worker threads"""
+
+    def __init__(self, concurrency: int = 4, max_retries: int = 4, backoff: float = 1.0,
+                 backoff_max: float = 30.0, max_jobs: int = 50):
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_jobs = max_jobs
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-extract")
+            return self._executor
+
+    def _backoff_delay(self, attempt: int, error: AdeExtractionError) -> float:
+        if error.retry_after is not None:
+            return min(self.backoff_max, error.retry_after)
+        # Full jitter, so throttled workers do not retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def _run(self, job: BatchJob, index: int, on_result: Optional[Callable[[str, List[ContractField]], None]]) -> None:
+        path = job.documents[index]["path"]
+        job.update(index, status=RUNNING, started_at=datetime.now().isoformat())
+        attempt = 0
+        while True:
+            attempt += 1
+            job.update(index, attempts=attempt)
+            try:
+                fields = extract_fields(path, strict=True)
+                if on_result is not None:
+                    on_result(path, fields)
+            except AdeExtractionError as e:
+                if e.retryable and attempt <= self.max_retries:
+                    delay = self._backoff_delay(attempt - 1, e)
+                    logger.warning(f"Batch {job.id}: {path} attempt {attempt} failed ({e}); retrying in {delay:.1f}s")
+                    job.update(index, status=RETRYING, error=str(e))
+                    time.sleep(delay)
+                    continue
+                job.update(index, status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+                return
+            except Exception as e:
+                logger.error(f"Batch {job.id}: {path} failed: {e}")
+                job.update(index, status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+                return
+            job.update(index, status=DONE, error=None, fields=[f.model_dump() for f in fields],
+                       finished_at=datetime.now().isoformat())
+            return
+
+    def submit(self, paths: List[str],
+               on_result: Optional[Callable[[str, List[ContractField]], None]] = None) -> BatchJob:
+        """Queue paths for extraction and return the job immediately.
+
+        on_result(path, fields) runs on the worker after each successful extraction.
+        """
+        job = BatchJob(paths)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs beyond max_jobs
+            for job_id in list(self._jobs):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._jobs[job_id].finished:
+                    del self._jobs[job_id]
+        executor = self._get_executor()
+        for index in range(len(paths)):
+            executor.submit(self._run, job, index, on_result)
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [{k: v for k, v in job.to_dict().items() if k != "documents"} for job in jobs]
+
+
+# Global instance
+batch_extractor = BatchExtractor(
+    concurrency=Config.BATCH_EXTRACTION_CONCURRENCY,
+    max_retries=Config.BATCH_EXTRACTION_MAX_RETRIES,
+    backoff=Config.BATCH_EXTRACTION_BACKOFF,
+    backoff_max=Config.BATCH_EXTRACTION_BACKOFF_MAX,
+    max_jobs=Config.BATCH_EXTRACTION_MAX_JOBS,
+)
@@ -1,49 +1,159 @@
-from typing import List
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from models.schemas import ComplianceFlag, Evidence, ContractField
 from retriever import retrieve
+from analysis_context import AnalysisContext
+
+logger = logging.getLogger(__name__)
 
 CATEGORIES = ["privacy", "labor", "tax"]
 
-def check(fields: List[ContractField], region: str) -> List[ComplianceFlag]:
-    flags: List[ComplianceFlag] = []
-    for cat in CATEGORIES:
-        hits = retrieve(cat, region, top_k=1)  # Pass region parameter
-        if not hits:
+# Deterministic checks, one entry per (field, category) pair:
+#   match          "rule" tests the category's top rule text, "value" the field value
+#   any_of         keywords; the check matches if any occurs (case-insensitive)
+#   risk_if_match / risk_otherwise   risk level for each outcome
+#   rationale      format string with {field}, {value}, {category}
+# Extra checks in the same format are read from rules/checks/*.json (a list of entries).
+CHECKS: List[Dict[str, object]] = [
+    {"field": "data_processing", "category": "privacy", "match": "rule",
+     "any_of": ["controller", "processor"], "risk_if_match": "LOW", "risk_otherwise": "HIGH",
+     "rationale": "Field '{field}' value '{value}' vs privacy rule snippet."},
+    {"field": "termination_notice", "category": "labor", "match": "value",
+     "any_of": ["30", "60"], "risk_if_match": "LOW", "risk_otherwise": "MED",
+     "rationale": "Termination notice '{value}' vs labor rule."},
+    {"field": "tax_withholding_clause", "category": "tax", "match": "value",
+     "any_of": ["applicable"], "risk_if_match": "LOW", "risk_otherwise": "HIGH",
+     "rationale": "Tax withholding clause '{value}' vs tax rule."},
+]
+
+CHECKS_DIR = Path(__file__).resolve().parent / "rules" / "checks"
+
+_MATCH_TARGETS = ("rule", "value")
+_RISK_LEVELS = ("HIGH", "MED", "LOW")
+
+
+class CompiledCheck(NamedTuple):
+    category: str
+    match_rule: bool
+    keywords: Tuple[str, ...]
+    risk_if_match: str
+    risk_otherwise: str
+    rationale: str
+    # Position in the table; flags are emitted in (category, field, order) order
+    order: int
+
+
+def compile_checks(entries: List[Dict[str, object]]) -> Tuple[Dict[str, List[CompiledCheck]], Dict[str, int]]:
+    """Compile table entries into field_name -> checks plus each category's rank.
+
+    Malformed entries are logged and skipped.
+    """
+    by_field: Dict[str, List[CompiledCheck]] = {}
+    category_rank: Dict[str, int] = {}
+    for order, entry in enumerate(entries):
+        try:
+            field = str(entry["field"])
+            category = str(entry["category"])
+            match = entry.get("match", "value")
+            keywords = tuple(str(k).lower() for k in entry["any_of"])
+            risk_if_match = str(entry.get("risk_if_match", "LOW")).upper()
+            risk_otherwise = str(entry.get("risk_otherwise", "HIGH")).upper()
+            rationale = str(entry.get("rationale", "Field '{field}' value '{value}' vs {category} rule."))
+            rationale.format(field="", value="", category="")
+        except (KeyError, IndexError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Skipping malformed compliance check {entry!r}: {e}")
+            continue
+        if match not in _MATCH_TARGETS or risk_if_match not in _RISK_LEVELS or risk_otherwise not in _RISK_LEVELS:
+            logger.warning(f"Skipping compliance check with unknown match/risk level: {entry!r}")
+            continue
+        category_rank.setdefault(category, len(category_rank))
+        by_field.setdefault(field, []).append(CompiledCheck(
+            category, match == "rule", keywords, risk_if_match, risk_otherwise, rationale, order))
+    return by_field, category_rank
+
+
+def load_check_files(directory: Path = CHECKS_DIR) -> List[Dict[str, object]]:
+    entries: List[Dict[str, object]] = []
+    for path in sorted(directory.glob("*.json")) if directory.is_dir() else []:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable check file {path}: {e}")
             continue
-        rule_text, _ = hits[0]
-        # naive mapping: improve later
-        for f in fields:
-            if cat == "privacy" and f.name == "data_processing":
-                risk = "LOW" if any(w in rule_text.lower() for w in ["controller", "processor"]) else "HIGH" 
-                flags.append(ComplianceFlag(
-                    id=f"{cat}-{f.name}",
-                    category=cat,
-                    region=region,
-                    risk_level=risk,
-                    rationale=f"Field '{f.name}' value '{f.value}' vs privacy rule snippet.",
-                    contract_evidence=f.evidence,
-                    rule_evidence=Evidence(file="rules_store", section="top_hit"),
-                ))
-            if cat == "labor" and f.name == "termination_notice":
-                risk = "LOW" if any(x in f.value.lower() for x in ["30", "60"]) else "MED"
-                flags.append(ComplianceFlag(
-                    id=f"{cat}-{f.name}",
-                    category=cat,
-                    region=region,
-                    risk_level=risk,
-                    rationale=f"Termination notice '{f.value}' vs labor rule.",
-                    contract_evidence=f.evidence,
-                    rule_evidence=Evidence(file="rules_store", section="top_hit"),
-                ))
-            if cat == "tax" and f.name == "tax_withholding_clause":
-                risk = "LOW" if "applicable" in f.value.lower() else "HIGH"
-                flags.append(ComplianceFlag(
-                    id=f"{cat}-{f.name}",
-                    category=cat,
-                    region=region,
-                    risk_level=risk,
-                    rationale=f"Tax withholding clause '{f.value}' vs tax rule.",
-                    contract_evidence=f.evidence,
-                    rule_evidence=Evidence(file="rules_store", section="top_hit"),
-                ))
-    return flags
\ No newline at end of file
+        if isinstance(data, dict):
+            data = data.get("checks", [])
+        if not isinstance(data, list):
+            logger.warning(f"Ignoring check file {path}: expected a list of checks")
+            continue
+        entries.extend(data)
+    return entries
+
+
+def _check_files_signature(directory: Path) -> Tuple[Tuple[str, float], ...]:
+    if not directory.is_dir():
+        return ()
+    signature = []
+    for path in sorted(directory.glob("*.json")):
+        try:
+            signature.append((path.name, path.stat().st_mtime))
+        except OSError:
+            continue
+    return tuple(signature)
+
+
+_COMPILED: Optional[Tuple[Dict[str, List[CompiledCheck]], Dict[str, int]]] = None
+_COMPILED_SIGNATURE: Optional[Tuple[Tuple[str, float], ...]] = None
+_COMPILE_LOCK = threading.Lock()
+
+
+def get_compiled_checks() -> Tuple[Dict[str, List[CompiledCheck]], Dict[str, int]]:
+    """Built-in plus on-disk checks, recompiled only when a check file changes."""
+    global _COMPILED, _COMPILED_SIGNATURE
+    signature = _check_files_signature(CHECKS_DIR)
+    with _COMPILE_LOCK:
+        if _COMPILED is None or signature != _COMPILED_SIGNATURE:
+            _COMPILED = compile_checks(CHECKS + load_check_files(CHECKS_DIR))
+            _COMPILED_SIGNATURE = signature
+        return _COMPILED
+
+
+def check(fields: List[ContractField], region: str,
+          context: Optional[AnalysisContext] = None) -> List[ComplianceFlag]:
+    by_field, category_rank = get_compiled_checks()
+    # Reuse retrievals already made for this request (e.g. by the AI checker)
+    retrieve_rules = context.retrieve if context is not None else retrieve
+    # category -> (rule text, rule evidence), or None if nothing was retrieved
+    rules: Dict[str, Optional[Tuple[str, Evidence]]] = {}
+
+    matched = []
+    for position, f in enumerate(fields):
+        for c in by_field.get(f.name, ()):
+            if c.category not in rules:
+                hits = retrieve_rules(c.category, region, top_k=1)  # Pass region parameter
+                rules[c.category] = None
+                if hits:
+                    # Point at the matched rule section when the hit carries its origin
+                    rules[c.category] = (hits[0][0].lower(), Evidence(
+                        file=getattr(hits[0], "source", None) or "rules_store",
+                        section=getattr(hits[0], "section", None) or "top_hit",
+                    ))
+            rule = rules[c.category]
+            if rule is None:
+                continue
+            rule_lower, rule_evidence = rule
+            subject = rule_lower if c.match_rule else f.value.lower()
+            risk = c.risk_if_match if any(k in subject for k in c.keywords) else c.risk_otherwise
+            matched.append(((category_rank[c.category], position, c.order), ComplianceFlag(
+                id=f"{c.category}-{f.name}",
+                category=c.category,
+                region=region,
+                risk_level=risk,
+                rationale=c.rationale.format(field=f.name, value=f.value, category=c.category),
+                contract_evidence=f.evidence,
+                rule_evidence=rule_evidence,
+            )))
+    matched.sort(key=lambda item: item[0])
+    return [flag for _, flag in matched]
@@ -0,0 +1,72 @@
+"""
+Section-level chunking of rule markdown for retrieval
+Splits a rule document at markdown headings and keeps, for every chunk, its
+heading path and character/byte offsets into the source text
+"""
+import re
+from typing import Any, Dict, List
+
+_HEADING_RE = re.compile(r"^[ ]{0,3}(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+
+def _byte_offset(text: str, char_offset: int, cache: Dict[int, int]) -> int:
+    if char_offset not in cache:
+        cache[char_offset] = len(text[:char_offset].encode("utf-8"))
+    return cache[char_offset]
+
+
+def chunk_markdown(text: str) -> List[Dict[str, Any]]:
+    """Split markdown into heading-delimited sections.
+
+    Each chunk has text (the exact slice of the source), heading_path (the
+    headings enclosing it, outermost first), start/end character offsets and
+    byte_start/byte_end UTF-8 offsets. Sections with no body of their own
+    (e.g. a document title directly followed by a subheading) are merged into
+    the following section so every chunk carries content.
+    """
+    headings = list(_HEADING_RE.finditer(text))
+    if not headings:
+        return [_make_chunk(text, 0, len(text), [], {})] if text.strip() else []
+
+    bounds = []
+    if text[:headings[0].start()].strip():
+        bounds.append((0, headings[0].start(), []))
+    stack: List[tuple] = []
+    for i, match in enumerate(headings):
+        level = len(match.group(1))
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, match.group(2).strip()))
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        bounds.append((match.start(), end, [h for _, h in stack]))
+
+    byte_cache: Dict[int, int] = {}
+    chunks = []
+    pending_start = None
+    for start, end, path in bounds:
+        if pending_start is not None:
+            start = pending_start
+        body = text[start:end]
+        # A heading line with nothing under it before the next heading
+        if len(body.strip().splitlines()) <= 1 and end < len(text) and path:
+            pending_start = start
+            continue
+        pending_start = None
+        chunks.append(_make_chunk(text, start, end, path, byte_cache))
+    return chunks
+
+
+def _make_chunk(text: str, start: int, end: int, path: List[str], byte_cache: Dict[int, int]) -> Dict[str, Any]:
+    return {
+        "text": text[start:end].strip("\n"),
+        "heading_path": path,
+        "start": start,
+        "end": end,
+        "byte_start": _byte_offset(text, start, byte_cache),
+        "byte_end": _byte_offset(text, end, byte_cache),
+    }
+
+
+def breadcrumb(heading_path: List[str]) -> str:
+    """Parent headings of a chunk, e.g. 'US Labor Law > Federal Requirements'."""
+    return " > ".join(heading_path[:-1])
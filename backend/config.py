@@ -12,6 +12,13 @@ class Config:
     
     # Pathway Configuration
     PATHWAY_API_KEY: Optional[str] = os.getenv("PATHWAY_API_KEY")
+    PATHWAY_SERVER_URL: str = os.getenv("PATHWAY_SERVER_URL", "http://127.0.0.1:8765")
+    PATHWAY_TIMEOUT: float = float(os.getenv("PATHWAY_TIMEOUT", "2.0"))
+    PATHWAY_FAILURE_THRESHOLD: int = int(os.getenv("PATHWAY_FAILURE_THRESHOLD", "3"))
+    PATHWAY_RESET_TIMEOUT: float = float(os.getenv("PATHWAY_RESET_TIMEOUT", "30"))
+    PATHWAY_PROBE_INTERVAL: float = float(os.getenv("PATHWAY_PROBE_INTERVAL", "5"))
+    PATHWAY_CONNECT_TIMEOUT: float = float(os.getenv("PATHWAY_CONNECT_TIMEOUT", "1.0"))
+    PATHWAY_POOL_SIZE: int = int(os.getenv("PATHWAY_POOL_SIZE", "8"))
     
     # API Configuration
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
@@ -24,6 +31,64 @@ class Config:
     CONTRACTS_DIR: str = "backend/contracts/sample"
     RULES_DIR: str = "backend/rules/seed"
     
+    # Fallback search index snapshot (defaults to <rules dir>/../.search_index)
+    SEARCH_INDEX_DIR: Optional[str] = os.getenv("SEARCH_INDEX_DIR")
+    SEARCH_INDEX_PERSIST_DELAY: float = float(os.getenv("SEARCH_INDEX_PERSIST_DELAY", "5"))
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+    # Contract field extraction: "ade" (LandingAI, local pypdf extraction as fallback) or
+    # "local" (pypdf only, never contacts ADE; for air-gapped deployments)
+    EXTRACTION_BACKEND: str = os.getenv("EXTRACTION_BACKEND", "ade").lower()
+    
+    # Shared LandingAI ADE clients; an invalid-key (401) response disables ADE for the cooldown
+    LANDINGAI_CLIENT_POOL_SIZE: int = int(os.getenv("LANDINGAI_CLIENT_POOL_SIZE", "4"))
+    LANDINGAI_CLIENT_WAIT: float = float(os.getenv("LANDINGAI_CLIENT_WAIT", "60"))
+    # Availability checks only wait this long for a free client
+    LANDINGAI_AVAILABILITY_WAIT: float = float(os.getenv("LANDINGAI_AVAILABILITY_WAIT", "1"))
+    LANDINGAI_AUTH_COOLDOWN: float = float(os.getenv("LANDINGAI_AUTH_COOLDOWN", "300"))
+    # ADE request quota shared by all extraction paths (requests/second, 0 = unlimited)
+    LANDINGAI_RATE_LIMIT: float = float(os.getenv("LANDINGAI_RATE_LIMIT", "2"))
+    LANDINGAI_RATE_BURST: int = int(os.getenv("LANDINGAI_RATE_BURST", "4"))
+    
+    # Batch extraction (/batch_extract)
+    BATCH_EXTRACTION_CONCURRENCY: int = int(os.getenv("BATCH_EXTRACTION_CONCURRENCY", "4"))
+    BATCH_EXTRACTION_MAX_RETRIES: int = int(os.getenv("BATCH_EXTRACTION_MAX_RETRIES", "4"))
+    BATCH_EXTRACTION_BACKOFF: float = float(os.getenv("BATCH_EXTRACTION_BACKOFF", "1.0"))
+    BATCH_EXTRACTION_BACKOFF_MAX: float = float(os.getenv("BATCH_EXTRACTION_BACKOFF_MAX", "30"))
+    BATCH_EXTRACTION_MAX_JOBS: int = int(os.getenv("BATCH_EXTRACTION_MAX_JOBS", "50"))
+    
+    # Document extraction results (SQLite + in-memory LRU), keyed by file content hash
+    EXTRACTION_CACHE_PATH: Optional[str] = os.getenv("EXTRACTION_CACHE_PATH")  # defaults to backend/.extraction_cache/
+    EXTRACTION_CACHE_MEMORY_MB: int = int(os.getenv("EXTRACTION_CACHE_MEMORY_MB", "32"))
+    EXTRACTION_CACHE_DISK_MB: int = int(os.getenv("EXTRACTION_CACHE_DISK_MB", "512"))
+    
+    # Risk correlation results, keyed by a fingerprint of the contract's fields
+    RISK_CORRELATION_CACHE_SIZE: int = int(os.getenv("RISK_CORRELATION_CACHE_SIZE", "256"))
+    
+    # Local dense (embedding) index used when the Pathway server is not running
+    DENSE_INDEX_ENABLED: bool = os.getenv("DENSE_INDEX_ENABLED", "true").lower() == "true"
+    DENSE_EMBEDDING_MODEL: str = os.getenv("DENSE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    DENSE_INDEX_DTYPE: str = os.getenv("DENSE_INDEX_DTYPE", "float16")  # float16 | int8
+    DENSE_BATCH_SIZE: int = int(os.getenv("DENSE_BATCH_SIZE", "32"))
+    
+    # Per-page PDF text cache (defaults to .pdf_text next to the search index)
+    PDF_TEXT_CACHE_DIR: Optional[str] = os.getenv("PDF_TEXT_CACHE_DIR")
+    # Each worker holds its own parse of the PDF, so more workers cost memory as well as CPU
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    # Background watcher over the rules and contracts trees
+    FILE_WATCHER_POLL_INTERVAL: float = float(os.getenv("FILE_WATCHER_POLL_INTERVAL", "2.0"))
+    FILE_WATCHER_MAX_EVENTS: int = int(os.getenv("FILE_WATCHER_MAX_EVENTS", "1000"))
+    FILE_WATCHER_USE_INOTIFY: bool = os.getenv("FILE_WATCHER_USE_INOTIFY", "true").lower() == "true"
+    
+    # Reciprocal-rank fusion of the lexical and dense search legs
+    SEARCH_RRF_K: int = int(os.getenv("SEARCH_RRF_K", "60"))
+    SEARCH_LEXICAL_WEIGHT: float = float(os.getenv("SEARCH_LEXICAL_WEIGHT", "1.0"))
+    SEARCH_DENSE_WEIGHT: float = float(os.getenv("SEARCH_DENSE_WEIGHT", "1.0"))
+    SEARCH_FUSION_DEPTH: int = int(os.getenv("SEARCH_FUSION_DEPTH", "10"))
+    SEARCH_FUSION_WORKERS: int = int(os.getenv("SEARCH_FUSION_WORKERS", "4"))
+    # async_hybrid_search offloads lexical passes above this many (term, document) pairs
+    SEARCH_INLINE_CPU_BUDGET: int = int(os.getenv("SEARCH_INLINE_CPU_BUDGET", "20000"))
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -0,0 +1,253 @@
+"""
+In-process dense vector index for rule chunks
+Chunks are embedded once on CPU in batches with the same MiniLM model the
+Pathway server uses; embeddings are stored as a float16 or int8-quantized
+NumPy matrix persisted on disk and keyed by content hash, so unchanged
+chunks are never re-embedded and top-k is a single matrix-vector product
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# numpy / sentence-transformers are optional; without them the index stays empty
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DENSE_AVAILABLE = NUMPY_AVAILABLE and SENTENCE_TRANSFORMERS_AVAILABLE
+
+_SCORE_BLOCK_ROWS = 4096
+# Rows no live chunk points to are dropped once they are this share of the matrix
+_COMPACT_ORPHAN_SHARE = 0.25
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class DenseIndex:
+    """Content-hash keyed embedding store with brute-force cosine top-k"""
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 dtype: str = "float16", batch_size: int = 32):
+        if dtype not in ("float16", "int8"):
+            raise ValueError("dtype must be 'float16' or 'int8'")
+        self.model_name = model_name
+        self.dtype = dtype
+        self.batch_size = batch_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._lock = threading.RLock()
+        # content hash -> row in self._matrix
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        self._scales = None
+        # live chunk ids and their content hashes, in matrix-view order
+        self._chunk_ids: List[str] = []
+        self._chunk_rows = None
+        self._chunk_tags = None
+        self._stats = {"embedded": 0, "reused": 0, "searches": 0, "orphans_dropped": 0}
+        # Bumped whenever the searchable chunk set, embeddings or tags change
+        self.version = 0
+
+    @property
+    def available(self) -> bool:
+        return DENSE_AVAILABLE
+
+    def __len__(self) -> int:
+        return len(self._chunk_ids)
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logger.info(f"Loading embedding model {self.model_name} on CPU")
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def _embed(self, texts: List[str]):
+        vectors = self._get_model().encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False,
+        )
+        return vectors.astype(np.float32)
+
+    def _quantize(self, vectors) -> Tuple[object, Optional[object]]:
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+        scales = np.abs(vectors).max(axis=1)
+        scales[scales == 0] = 1.0
+        quantized = np.round(vectors / scales[:, None] * 127).astype(np.int8)
+        return quantized, (scales / 127).astype(np.float32)
+
+    def sync(self, chunks: Dict[str, str], tags: Optional[Dict[str, int]] = None) -> int:
+        """Make the live set exactly chunks (chunk id -> text); embeds only unseen content.
+
+        tags optionally maps chunk id -> jurisdiction bitmask for filtered search.
+        Returns the number of newly embedded chunks.
+        """
+        if not self.available:
+            return 0
+        hashes = {chunk_id: content_hash(text) for chunk_id, text in chunks.items()}
+        with self._lock:
+            missing = {}
+            for chunk_id, digest in hashes.items():
+                if digest not in self._rows and digest not in missing:
+                    missing[digest] = chunks[chunk_id]
+            self._stats["reused"] += len(hashes) - len(missing)
+        vectors = scales = None
+        if missing:
+            vectors, scales = self._quantize(self._embed(list(missing.values())))
+        with self._lock:
+            live = {digest for digest in hashes.values() if digest in self._rows}
+            orphans = len(self._rows) - len(live)
+            if missing or orphans > _COMPACT_ORPHAN_SHARE * len(self._rows):
+                # Appending copies the (possibly memory-mapped) matrix anyway, so
+                # orphaned rows of edited or deleted chunks are dropped in the same pass
+                self._rebuild(live, list(missing), vectors, scales)
+                self._stats["embedded"] += len(missing)
+            chunk_ids = [c for c in hashes if hashes[c] in self._rows]
+            chunk_rows = np.array([self._rows[hashes[c]] for c in chunk_ids], dtype=np.int64)
+            chunk_tags = np.array([(tags or {}).get(c, 0) for c in chunk_ids], dtype=np.int64)
+            if (missing or chunk_ids != self._chunk_ids or not np.array_equal(chunk_rows, self._chunk_rows)
+                    or not np.array_equal(chunk_tags, self._chunk_tags)):
+                self.version += 1
+            self._chunk_ids, self._chunk_rows, self._chunk_tags = chunk_ids, chunk_rows, chunk_tags
+        return len(missing)
+
+    def _rebuild(self, keep: Set[str], digests: List[str], vectors, scales) -> None:
+        """Replace the matrix with the rows of keep followed by the new vectors for digests."""
+        kept = sorted(keep, key=self._rows.__getitem__)
+        old_rows = np.array([self._rows[d] for d in kept], dtype=np.int64)
+        matrices, scale_parts = [], []
+        if self._matrix is not None:
+            matrices.append(self._matrix[old_rows])
+            if self._scales is not None:
+                scale_parts.append(self._scales[old_rows])
+        if vectors is not None:
+            matrices.append(vectors)
+            if scales is not None:
+                scale_parts.append(scales)
+        self._matrix = np.concatenate(matrices) if matrices else None
+        self._scales = np.concatenate(scale_parts) if scale_parts else None
+        self._stats["orphans_dropped"] += len(self._rows) - len(kept)
+        self._rows = {digest: row for row, digest in enumerate(kept + digests)}
+
+    def search(self, query: str, top_k: int = 3, tag_mask: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Cosine top-k over live chunks (optionally only those sharing a tag bit); returns (chunk id, similarity)."""
+        if not self.available or not self._chunk_ids or top_k <= 0:
+            return []
+        q = self._embed([query])[0]
+        with self._lock:
+            matrix, scales, rows, chunk_ids = self._matrix, self._scales, self._chunk_rows, self._chunk_ids
+            chunk_tags = self._chunk_tags
+            self._stats["searches"] += 1
+        scores = np.empty(len(rows), dtype=np.float32)
+        # Dequantize in bounded blocks so the float32 working set stays small
+        for start in range(0, len(rows), _SCORE_BLOCK_ROWS):
+            block_rows = rows[start:start + _SCORE_BLOCK_ROWS]
+            block = matrix[block_rows].astype(np.float32)
+            block_scores = block @ q
+            if scales is not None:
+                block_scores *= scales[block_rows]
+            scores[start:start + len(block_rows)] = block_scores
+        candidates = np.arange(len(scores))
+        if tag_mask is not None:
+            candidates = np.flatnonzero(chunk_tags & tag_mask)
+        k = min(top_k, len(candidates))
+        if k == 0:
+            return []
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(chunk_ids[i], float(scores[i])) for i in top]
+
+    def save(self, directory: Path) -> None:
+        """Persist only the embeddings of live chunks (drops orphaned rows).
+
+        The matrix and scales go to files named for this save; keys.json,
+        which names them, is replaced last, so a crash at any point leaves
+        either the previous or the new set, never a mix.
+        """
+        if not self.available or self._matrix is None:
+            return
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            live = sorted(set(self._chunk_rows.tolist()))
+            digest_by_row = {row: digest for digest, row in self._rows.items()}
+            keys = [digest_by_row[row] for row in live]
+            matrix = self._matrix[live]
+            scales = self._scales[live] if self._scales is not None else None
+        generation = f"{int(time.time() * 1000)}-{os.getpid()}"
+        files = {"embeddings": f"embeddings-{generation}.npy"}
+        if scales is not None:
+            files["scales"] = f"scales-{generation}.npy"
+        for name, array in (("embeddings", matrix), ("scales", scales)):
+            if name in files:
+                tmp = directory / f".{files[name]}"
+                with open(tmp, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp, directory / files[name])
+        meta = {"model": self.model_name, "dtype": self.dtype, "keys": keys, "files": files}
+        tmp = directory / f".keys-{generation}.json"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, directory / "keys.json")
+        # Earlier generations are garbage now; a file still mapped elsewhere (Windows) is left for next time
+        for stale in list(directory.glob("embeddings*.npy")) + list(directory.glob("scales*.npy")):
+            if stale.name not in files.values():
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def load(self, directory: Path) -> bool:
+        """Map persisted embeddings read-only; ignored if model or dtype differ."""
+        if not self.available:
+            return False
+        directory = Path(directory)
+        try:
+            meta = json.loads((directory / "keys.json").read_text(encoding="utf-8"))
+            if meta.get("model") != self.model_name or meta.get("dtype") != self.dtype:
+                return False
+            # Snapshots written before "files" existed used fixed names
+            files = meta.get("files") or {"embeddings": "embeddings.npy", "scales": "scales.npy"}
+            matrix = np.load(directory / files["embeddings"], mmap_mode="r")
+            scales = np.load(directory / files["scales"]) if self.dtype == "int8" else None
+        except Exception as e:
+            logger.info(f"No reusable dense embeddings in {directory}: {e}")
+            return False
+        if matrix.shape[0] != len(meta["keys"]):
+            return False
+        with self._lock:
+            self._matrix = matrix
+            self._scales = scales
+            self._rows = {digest: row for row, digest in enumerate(meta["keys"])}
+        logger.info(f"Loaded {len(self._rows)} cached chunk embeddings")
+        return True
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["chunks"] = len(self._chunk_ids)
+            stats["cached_embeddings"] = len(self._rows)
+            stats["version"] = self.version
+        stats["available"] = self.available
+        stats["dtype"] = self.dtype
+        return stats
@@ -0,0 +1,159 @@
+"""
+Persistent cache for document extraction results
+Entries are keyed by the SHA-256 of the document bytes plus the extractor
+version, so a file overwritten under the same name is re-extracted while an
+identical file under any name is not. A byte-bounded in-memory LRU sits in
+front of a byte-bounded SQLite store shared by all workers on the host
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extractions_accessed ON extractions(accessed);
+"""
+
+_HASH_BLOCK = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Two-tier (memory LRU + SQLite) cache of JSON-serializable extraction results"""
+
+    def __init__(self, db_path: Optional[Path], memory_bytes: int = 32 << 20, disk_bytes: int = 512 << 20):
+        self.db_path = Path(db_path) if db_path else None
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        # key -> encoded JSON; decoded on every hit so callers never share result objects
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._disk_ok = self.db_path is not None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(digest: str, kind: str, version: str) -> str:
+        return f"{digest}:{kind}:{version}"
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self._disk_ok:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                # One connection per thread; WAL lets several worker processes share the file
+                conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Extraction cache disabled on disk ({self.db_path}): {e}")
+                self._disk_ok = False
+                return None
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, encoded: bytes) -> None:
+        if len(encoded) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous)
+            self._memory[key] = encoded
+            self._memory_used += len(encoded)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += n
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            encoded = self._memory.get(key)
+            if encoded is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+        if encoded is not None:
+            return json.loads(encoded)
+        conn = self._connection()
+        if conn is not None:
+            try:
+                row = conn.execute("SELECT value FROM extractions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE extractions SET accessed = ? WHERE key = ?", (time.time(), key))
+                    conn.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, bytes(row[0]))
+                    self._count("disk_hits")
+                    return value
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Extraction cache read failed: {e}")
+        self._count("misses")
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, default=str).encode("utf-8")
+        self._remember(key, encoded)
+        conn = self._connection()
+        if conn is None or len(encoded) > self.disk_bytes:
+            return
+        try:
+            conn.execute("INSERT OR REPLACE INTO extractions (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                         (key, encoded, len(encoded), time.time()))
+            self._evict(conn)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used rows until the store fits in disk_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.disk_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM extractions ORDER BY accessed").fetchall():
+            if total <= self.disk_bytes:
+                break
+            conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._count("evictions", evicted)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_used
+        conn = self._connection()
+        if conn is not None:
+            try:
+                stats["disk_entries"], stats["disk_bytes"] = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions").fetchone()
+            except sqlite3.Error:
+                pass
+        return stats
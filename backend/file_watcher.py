@@ -0,0 +1,327 @@
+"""
+Background watcher for the rules and contracts trees
+Keeps an in-memory catalog of documents (path, type, size, mtime, content
+hash) and a bounded ring buffer of change events, so live-activity endpoints
+answer from memory instead of walking the tree on every poll. Uses inotify
+through ctypes on Linux and falls back to periodic rescans elsewhere
+"""
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (_IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")   # wd, mask, cookie, name length
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class FileWatcher:
+    """Catalog of watched documents plus a ring buffer of their changes.
+
+    roots is a list of (directory, document type, file suffixes). Listeners
+    registered with subscribe() are called with each change event from the
+    watcher thread.
+    """
+
+    def __init__(self, roots: List[Tuple[Path, str, Tuple[str, ...]]], max_events: int = 1000,
+                 poll_interval: float = 2.0, use_inotify: bool = True):
+        self.roots = [(Path(d), doc_type, tuple(s.lower() for s in suffixes)) for d, doc_type, suffixes in roots]
+        self.poll_interval = poll_interval
+        self._use_inotify = use_inotify
+        self._catalog: Dict[str, Dict[str, Any]] = {}
+        self._counts: Dict[str, int] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.backend = "none"
+        self._stats = {"scans": 0, "events": 0, "overflows": 0}
+
+    # ---- catalog queries (O(1) / O(ring buffer), never touch the disk) ----
+
+    def document_count(self, doc_type: Optional[str] = None) -> int:
+        with self._lock:
+            if doc_type is None:
+                return len(self._catalog)
+            return self._counts.get(doc_type, 0)
+
+    def documents(self, doc_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(d) for d in self._catalog.values() if doc_type is None or d["type"] == doc_type]
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            doc = self._catalog.get(path)
+            return dict(doc) if doc else None
+
+    def recent_changes(self, window: float = 3600.0) -> List[Dict[str, Any]]:
+        """Latest event per path within window seconds, newest first."""
+        cutoff = time.time() - window
+        seen = set()
+        changes = []
+        with self._lock:
+            events = list(self._events)
+        for event in reversed(events):
+            if event["modified"] < cutoff or event["path"] in seen:
+                continue
+            seen.add(event["path"])
+            changes.append(dict(event))
+        return sorted(changes, key=lambda x: x["modified"], reverse=True)
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["documents"] = len(self._catalog)
+            stats["buffered_events"] = len(self._events)
+        stats["backend"] = self.backend
+        return stats
+
+    # ---- catalog maintenance ----
+
+    def _classify(self, path: Path) -> Optional[str]:
+        suffix = path.suffix.lower()
+        for root, doc_type, suffixes in self.roots:
+            if suffix in suffixes and (path == root or root in path.parents):
+                return doc_type
+        return None
+
+    @staticmethod
+    def _event(kind: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {"path": entry["path"], "type": entry["type"], "event": kind,
+                "modified": entry["mtime"] if kind != "deleted" else time.time(),
+                "size": entry["size"]}
+
+    def _emit(self, kind: str, entry: Dict[str, Any], notify: bool = True) -> None:
+        if not notify:
+            return
+        event = self._event(kind, entry)
+        with self._lock:
+            self._events.append(event)
+            self._stats["events"] += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"File watcher listener failed for {event['path']}: {e}")
+
+    def refresh_path(self, path: Path, notify: bool = True) -> None:
+        """Re-stat one file and record a created/modified/deleted event if it changed.
+
+        With notify=False the catalog is updated silently (no event, no listeners).
+        """
+        doc_type = self._classify(path)
+        if doc_type is None:
+            return
+        key = str(path)
+        try:
+            st = path.stat()
+        except OSError:
+            self.forget_path(path, notify)
+            return
+        with self._lock:
+            previous = self._catalog.get(key)
+        if previous and previous["mtime"] == st.st_mtime and previous["size"] == st.st_size:
+            return
+        sha256 = _file_hash(path)
+        if sha256 is None:
+            return
+        entry = {"path": key, "type": doc_type, "size": st.st_size, "mtime": st.st_mtime, "sha256": sha256}
+        with self._lock:
+            self._catalog[key] = entry
+            if previous is None:
+                self._counts[doc_type] = self._counts.get(doc_type, 0) + 1
+        if previous is None:
+            self._emit("created", entry, notify)
+        elif previous["sha256"] != sha256:
+            self._emit("modified", entry, notify)
+
+    def forget_path(self, path: Path, notify: bool = True) -> None:
+        """Drop path, or every catalogued file under it if it was a directory."""
+        key = str(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        with self._lock:
+            gone = [p for p in self._catalog if p == key or p.startswith(prefix)]
+            entries = [self._catalog.pop(p) for p in gone]
+            for entry in entries:
+                self._counts[entry["type"]] -= 1
+        for entry in entries:
+            self._emit("deleted", entry, notify)
+
+    def _walk(self, directory: Path):
+        for dirpath, _, filenames in os.walk(directory):
+            for name in filenames:
+                yield Path(dirpath) / name
+
+    def scan(self, notify: bool = True) -> None:
+        """Full walk of every root; reconciles the catalog with the disk."""
+        present = set()
+        for root, _, _ in self.roots:
+            if not root.exists():
+                continue
+            for path in self._walk(root):
+                if self._classify(path) is not None:
+                    present.add(str(path))
+                    self.refresh_path(path, notify)
+        with self._lock:
+            missing = [p for p in self._catalog if p not in present]
+            self._stats["scans"] += 1
+        for key in missing:
+            self.forget_path(Path(key), notify)
+
+    # ---- background thread ----
+
+    def start(self) -> None:
+        """Idempotent: initial scan, then watch in a daemon thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self.scan(notify=False)
+        # Seed the ring buffer with the most recently modified files so
+        # recent_changes is meaningful straight after startup
+        with self._lock:
+            newest = sorted(self._catalog.values(), key=lambda d: d["mtime"])[-self._events.maxlen:]
+            self._events.extend(self._event("created", entry) for entry in newest)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        libc = _load_inotify() if self._use_inotify else None
+        if libc is not None:
+            try:
+                self._run_inotify(libc)
+                return
+            except OSError as e:
+                logger.info(f"inotify unavailable ({e}), falling back to polling")
+        self._run_polling()
+
+    def _run_polling(self) -> None:
+        self.backend = "polling"
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.scan()
+            except Exception as e:
+                logger.warning(f"File watcher scan failed: {e}")
+
+    def _run_inotify(self, libc) -> None:
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.backend = "inotify"
+        watches: Dict[int, Path] = {}
+
+        def add_watch(directory: Path) -> None:
+            for dirpath, _, _ in os.walk(directory):
+                wd = libc.inotify_add_watch(fd, os.fsencode(dirpath), _WATCH_MASK)
+                if wd >= 0:
+                    watches[wd] = Path(dirpath)
+
+        def watch_roots() -> None:
+            watched = set(watches.values())
+            added = False
+            for root, _, _ in self.roots:
+                if root.exists() and root not in watched:
+                    add_watch(root)
+                    added = True
+            if added:
+                # Catch changes made between the last scan and the watch going live
+                self.scan()
+
+        try:
+            watch_roots()
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], self.poll_interval)
+                if not ready:
+                    # Pick up roots created after startup
+                    watch_roots()
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                    name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + name_len].rstrip(b"\0")
+                    offset += _EVENT_HEADER.size + name_len
+                    if mask & _IN_Q_OVERFLOW:
+                        with self._lock:
+                            self._stats["overflows"] += 1
+                        self.scan()
+                        continue
+                    if mask & _IN_IGNORED:
+                        watches.pop(wd, None)
+                        continue
+                    directory = watches.get(wd)
+                    if directory is None or not name:
+                        continue
+                    path = directory / os.fsdecode(name)
+                    if mask & _IN_ISDIR:
+                        if mask & (_IN_CREATE | _IN_MOVED_TO):
+                            add_watch(path)
+                            for child in self._walk(path):
+                                self.refresh_path(child)
+                        elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                            self.forget_path(path)
+                    elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                        self.forget_path(path)
+                    elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_ATTRIB):
+                        self.refresh_path(path)
+        finally:
+            os.close(fd)
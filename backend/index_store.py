@@ -0,0 +1,199 @@
+"""
+On-disk snapshot format for the fallback search index
+A snapshot directory holds a sorted term dictionary and fixed-width postings
+arrays that are memory-mapped read-only, so every uvicorn worker on the host
+shares the same page-cache pages instead of re-tokenizing the rules tree
+
+Layout of <root>/<version>/:
+    manifest.json   documents (id, group, type, path, chunk metadata, field lengths, text span)
+                    and per-group source fingerprints (mtime, size, sha256)
+    lexicon.bin     header, fixed-width term entries sorted by UTF-8 bytes, term blob
+    postings.bin    (doc ordinal, heading tf, body tf) records as little-endian uint32
+    texts.bin       concatenated UTF-8 document texts
+<root>/CURRENT names the active version and is swapped atomically
+"""
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 5
+_MAGIC = b"CCIX"
+_HEADER = struct.Struct("<4sII")        # magic, format version, term count
+_ENTRY = struct.Struct("<IHII")         # term offset, term length, postings offset, postings count
+_POSTING = struct.Struct("<III")        # doc ordinal, heading tf, body tf
+
+
+def _map(path: Path):
+    if path.stat().st_size == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedSegment:
+    """Read-only, memory-mapped view of one index snapshot"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / "manifest.json").read_text(encoding="utf-8"))
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported index format {manifest.get('format')}")
+        self.docs: List[Dict[str, Any]] = manifest["docs"]
+        self.doc_ids: List[str] = [d["id"] for d in self.docs]
+        self.ordinals: Dict[str, int] = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+        self.field_length_totals: List[int] = manifest["field_length_totals"]
+        self.sources: Dict[str, Dict[str, Any]] = manifest.get("sources", {})
+
+        self._lexicon = _map(self.directory / "lexicon.bin")
+        self._postings = _map(self.directory / "postings.bin")
+        self._texts = _map(self.directory / "texts.bin")
+        magic, version, self.n_terms = _HEADER.unpack_from(self._lexicon, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("corrupt lexicon header")
+        self._blob_start = _HEADER.size + self.n_terms * _ENTRY.size
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _entry(self, i: int) -> Tuple[bytes, int, int]:
+        term_off, term_len, post_off, post_count = _ENTRY.unpack_from(self._lexicon, _HEADER.size + i * _ENTRY.size)
+        start = self._blob_start + term_off
+        return self._lexicon[start:start + term_len], post_off, post_count
+
+    def _find(self, term: str) -> Optional[Tuple[int, int]]:
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_term, post_off, post_count = self._entry(mid)
+            if mid_term < key:
+                lo = mid + 1
+            elif mid_term > key:
+                hi = mid
+            else:
+                return post_off, post_count
+        return None
+
+    def postings(self, term: str) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        """Yield (doc ordinal, field tfs) for term."""
+        found = self._find(term)
+        if found is None:
+            return
+        post_off, post_count = found
+        end = post_off + post_count * _POSTING.size
+        for ordinal, tf_heading, tf_body in _POSTING.iter_unpack(self._postings[post_off:end]):
+            yield ordinal, (tf_heading, tf_body)
+
+    def terms(self) -> Iterator[str]:
+        for i in range(self.n_terms):
+            yield self._entry(i)[0].decode("utf-8")
+
+    def text(self, ordinal: int) -> str:
+        doc = self.docs[ordinal]
+        start = doc["text_offset"]
+        return self._texts[start:start + doc["text_length"]].decode("utf-8", errors="ignore")
+
+
+def write_snapshot(index, root: Path) -> Path:
+    """Serialize every live document of index into a new version under root.
+
+    The caller must hold index.lock so the snapshot is consistent.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    version = f"v{int(time.time() * 1000)}-{os.getpid()}"
+    tmp_dir = root / f".tmp-{version}"
+    tmp_dir.mkdir()
+
+    doc_ids = list(index.doc_ids())
+    ordinals = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+    docs: List[Dict[str, Any]] = []
+    totals = [0, 0]
+    with open(tmp_dir / "texts.bin", "wb") as texts:
+        offset = 0
+        for doc_id in doc_ids:
+            doc = index.get_document(doc_id)
+            data = doc["text"].encode("utf-8")
+            texts.write(data)
+            lengths = list(index.field_lengths(doc_id))
+            totals = [t + l for t, l in zip(totals, lengths)]
+            docs.append({
+                "id": doc_id,
+                "group": doc["group"],
+                "type": doc["type"],
+                "path": doc["path"],
+                "meta": doc.get("meta") or {},
+                "field_lengths": lengths,
+                "text_offset": offset,
+                "text_length": len(data),
+            })
+            offset += len(data)
+
+    terms = sorted(index.terms(), key=lambda t: t.encode("utf-8"))
+    entries = []
+    blob = bytearray()
+    with open(tmp_dir / "postings.bin", "wb") as postings_file:
+        post_off = 0
+        for term in terms:
+            postings = sorted((ordinals[d], tfs) for d, tfs in index.postings(term).items() if d in ordinals)
+            if not postings:
+                continue
+            for ordinal, tfs in postings:
+                postings_file.write(_POSTING.pack(ordinal, *tfs))
+            encoded = term.encode("utf-8")
+            entries.append((len(blob), len(encoded), post_off, len(postings)))
+            blob += encoded
+            post_off += len(postings) * _POSTING.size
+
+    with open(tmp_dir / "lexicon.bin", "wb") as lexicon:
+        lexicon.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, len(entries)))
+        for entry in entries:
+            lexicon.write(_ENTRY.pack(*entry))
+        lexicon.write(blob)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "created": time.time(),
+        "docs": docs,
+        "field_length_totals": totals,
+        "sources": index.sources(),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    final_dir = root / version
+    os.replace(tmp_dir, final_dir)
+    current_tmp = root / f".CURRENT-{version}"
+    current_tmp.write_text(version, encoding="utf-8")
+    os.replace(current_tmp, root / "CURRENT")
+    _prune_versions(root, keep=version)
+    return final_dir
+
+
+def _prune_versions(root: Path, keep: str, retain: int = 2) -> None:
+    """Drop old versions; workers still mapping them keep their pages until they remap."""
+    versions = sorted((p for p in root.iterdir() if p.is_dir() and p.name.startswith("v")),
+                      key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in versions[retain:]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def load_snapshot(root: Path) -> Optional[MappedSegment]:
+    """Map the CURRENT snapshot under root, or None if there is no usable one."""
+    current = Path(root) / "CURRENT"
+    if not current.exists():
+        return None
+    try:
+        version = current.read_text(encoding="utf-8").strip()
+        return MappedSegment(Path(root) / version)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable search index snapshot: {e}")
+        return None
@@ -0,0 +1,76 @@
+"""
+Multi-pattern substring matching (Aho-Corasick)
+All patterns are compiled into one automaton, so a text is scanned once no
+matter how many patterns there are; each pattern carries the payloads it was
+registered with
+"""
+from collections import deque
+from typing import Dict, Generic, Iterable, List, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AhoCorasick(Generic[T]):
+    """Case-insensitive automaton over a fixed set of patterns"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, T]]):
+        # State 0 is the root; goto[s] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state, including those reached through fail links
+        self._out: List[List[str]] = [[]]
+        self._payloads: Dict[str, List[T]] = {}
+        for pattern, payload in patterns:
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            if pattern not in self._payloads:
+                self._payloads[pattern] = []
+                self._insert(pattern)
+            self._payloads[pattern].append(payload)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _insert(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def patterns_in(self, text: str) -> Set[str]:
+        """Distinct (lower-cased) patterns occurring anywhere in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def matches(self, text: str) -> List[T]:
+        """Payloads of every pattern found in text (one scan of text)."""
+        return [payload for pattern in self.patterns_in(text) for payload in self._payloads[pattern]]
@@ -0,0 +1,130 @@
+"""
+Jurisdiction tagging for rule text
+Each rule chunk is classified once at ingestion into a bitmask of the regions
+it applies to; the mask decides which search shards the chunk is placed in
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+EU = 1 << 0
+US = 1 << 1
+IN = 1 << 2
+UK = 1 << 3
+# Set when no specific region matched; such chunks live in the global shard
+GLOBAL = 1 << 4
+
+REGION_BITS: Dict[str, int] = {"EU": EU, "US": US, "IN": IN, "UK": UK}
+BUILTIN_REGIONS = frozenset(REGION_BITS)
+
+# Region-specific keywords
+_REGION_KEYWORDS = {
+    "EU": ["eu", "european", "directive", "gdpr", "european union"],
+    "US": ["us", "united states", "california", "ccpa", "federal", "american"],
+    "IN": ["india", "indian", "gst", "companies act"],
+    "UK": ["uk", "united kingdom", "british", "employment act"]
+}
+
+
+def register_region(code: str, keywords: List[str]) -> int:
+    """Add a jurisdiction (or return the bit of an existing one); tagged by whole-word keyword match."""
+    code = code.upper()
+    if code in REGION_BITS:
+        return REGION_BITS[code]
+    bit = max(list(REGION_BITS.values()) + [GLOBAL]) << 1
+    REGION_BITS[code] = bit
+    _REGION_KEYWORDS[code] = [k.lower() for k in keywords]
+    return bit
+
+
+def region_keywords(code: str) -> List[str]:
+    return list(_REGION_KEYWORDS.get(code.upper(), []))
+
+
+def region_bit(region: Optional[str]) -> Optional[int]:
+    """Bit for a region code, or None for regions without tags (no filtering)."""
+    return REGION_BITS.get(region.upper()) if region else None
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> "re.Pattern":
+    # Whole words only: a bare substring test finds "us" in "must" and "eu" in "queue"
+    return re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")\b")
+
+
+def _mentions(rule_lower: str, keywords: List[str]) -> bool:
+    return bool(keywords) and _keyword_pattern(tuple(keywords)).search(rule_lower) is not None
+
+
+def applies_to_region(rule_lower: str, region_upper: str) -> bool:
+    """Check if a (lower-cased) rule is applicable to the specified region"""
+    # Get target region keywords
+    target_keywords = _REGION_KEYWORDS.get(region_upper, [])
+    if not target_keywords:
+        return True
+
+    # Check if rule contains target region keywords
+    has_target_region = _mentions(rule_lower, target_keywords)
+
+    # For US region, prioritize US-specific rules and exclude pure EU rules
+    if region_upper == "US":
+        us_specific_keywords = ["ccpa", "california", "federal", "american", "united states"]
+        has_us_specific = _mentions(rule_lower, us_specific_keywords)
+
+        # If it has US-specific terms, it's good
+        if has_us_specific:
+            return True
+
+        # If it's primarily EU (GDPR) without US context, exclude it
+        # Check for strong EU indicators
+        eu_strong_indicators = ["eu gdpr", "european gdpr", "gdpr regulation", "eu directive"]
+        is_eu_primary = _mentions(rule_lower, eu_strong_indicators)
+
+        # US-specific keywords (ccpa/california/federal) are absent here, so any
+        # GDPR mention without them marks the rule as EU-only
+        if is_eu_primary or _mentions(rule_lower, ["gdpr"]):
+            return False
+
+    # For EU region, prioritize EU-specific rules and exclude pure US rules
+    elif region_upper == "EU":
+        eu_specific_keywords = ["eu", "european", "gdpr", "directive"]
+        has_eu_specific = _mentions(rule_lower, eu_specific_keywords)
+
+        # If it has EU-specific terms, it's good
+        if has_eu_specific:
+            return True
+
+        # If it's primarily US (CCPA) without EU context, exclude it
+        us_primary_keywords = ["ccpa california", "us federal", "american law"]
+        is_us_primary = _mentions(rule_lower, us_primary_keywords)
+        if is_us_primary:
+            return False
+
+    return has_target_region
+
+
+def classify(text: str) -> int:
+    """Bitmask of the regions text applies to (GLOBAL if none)."""
+    rule_lower = text.lower()
+    mask = 0
+    for region, bit in REGION_BITS.items():
+        if applies_to_region(rule_lower, region):
+            mask |= bit
+    return mask or GLOBAL
+
+
+def narrow(file_mask: int, section_mask: int) -> int:
+    """Mask of a section in a file tagged file_mask.
+
+    A section inherits the file's regions and may narrow them, never widen
+    them: a section naming no region (or only regions the file as a whole
+    does not apply to) keeps the file mask.
+    """
+    if file_mask == GLOBAL:
+        return section_mask
+    return (section_mask & file_mask) or file_mask
+
+
+def matches(mask: int, region: Optional[str]) -> bool:
+    bit = region_bit(region)
+    return bit is None or bool(mask & bit)
@@ -4,16 +4,27 @@ Uses DPT-2 model for structured extraction from financial documents
 """
 import os
 import logging
-import hashlib
+import queue
+import re
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Any, Optional
 from pathlib import Path
 from models.schemas import ContractField, Evidence
 from config import Config
+from extraction_cache import ExtractionCache, file_digest
+from parsed_document import ParsedDocument
+from local_extractor import extract_fields_locally
 
-# Simple in-memory cache for LandingAI responses
-_landingai_cache = {}
-CACHE_TTL = 300  # 5 minutes cache
+# Part of every extraction cache key; bump when the ADE model or chunk format changes
+EXTRACTOR_VERSION = "dpt-2-latest/2"
+
+_EXTRACTION_CACHE: Optional[ExtractionCache] = None
+_EXTRACTION_CACHE_LOCK = threading.Lock()
+# One [lock, holders] entry per document digest while anyone holds or waits for it
+_PARSE_LOCKS: Dict[str, List[Any]] = {}
+_PARSE_LOCKS_GUARD = threading.Lock()
 
 # Try to import LandingAI ADE, fallback if not available
 try:
@@ -27,203 +38,295 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize LandingAI ADE client
-def get_ade_client():
-    """Initialize LandingAI ADE client with API key"""
+class AdeExtractionError(Exception):
+    """An ADE parse failed; raised only to callers that asked for strict extraction"""
+    
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+_RETRYABLE_STATUS_RE = re.compile(r"\b(429|5\d\d)\b")
+
+def _ade_error(e: Exception) -> AdeExtractionError:
+    """Classify an SDK/transport exception: rate limiting, 5xx and network errors are retryable."""
+    response = getattr(e, "response", None)
+    status = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+    if isinstance(status, int):
+        retryable = status == 429 or status >= 500
+    else:
+        retryable = isinstance(e, (TimeoutError, ConnectionError)) or bool(_RETRYABLE_STATUS_RE.search(str(e)))
+    retry_after = None
+    try:
+        retry_after = float(getattr(response, "headers", {}).get("retry-after"))
+    except (TypeError, ValueError, AttributeError):
+        pass
+    return AdeExtractionError(str(e), retryable=retryable, retry_after=retry_after)
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter (rate tokens/second, up to burst stored)"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Every remote parse takes a token, whichever path (request, batch, MCP) triggered it
+_ADE_RATE = TokenBucket(Config.LANDINGAI_RATE_LIMIT, Config.LANDINGAI_RATE_BURST)
+
+class AdeClientPool:
+    """Thread-safe pool of LandingAI ADE clients, created lazily and reused across requests"""
+    
+    def __init__(self, factory: Callable[[], Any], size: int = 4, wait: float = 60.0,
+                 auth_cooldown: float = 300.0):
+        self._factory = factory
+        self.size = size
+        self.wait = wait
+        self.auth_cooldown = auth_cooldown
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._unavailable_until = 0.0
+        self._stats = {"clients_created": 0, "checkouts": 0, "wait_timeouts": 0, "auth_failures": 0}
+    
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+    
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+    
+    def mark_unauthorized(self) -> None:
+        """Stop handing out clients for auth_cooldown seconds after a 401."""
+        with self._lock:
+            self._stats["auth_failures"] += 1
+            self._unavailable_until = time.monotonic() + self.auth_cooldown
+        # Clients carry the rejected key; the next ones are built from the current config
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        logger.error(f"LandingAI ADE rejected the API key; using fallback extraction for {self.auth_cooldown:g}s")
+    
+    @contextmanager
+    def client(self, wait: Optional[float] = None) -> Iterator[Optional[Any]]:
+        """Check out a client for the duration of the block (None if ADE is unavailable).
+
+        wait overrides how long to wait for a free client (default: the pool's wait).
+        """
+        if not self.available:
+            yield None
+            return
+        if not self._slots.acquire(timeout=self.wait if wait is None else wait):
+            self._count("wait_timeouts")
+            logger.warning("No LandingAI ADE client free; using fallback extraction")
+            yield None
+            return
+        try:
+            try:
+                ade_client = self._idle.get_nowait()
+            except queue.Empty:
+                try:
+                    logger.info("Initializing LandingAI ADE with API key")
+                    ade_client = self._factory()
+                except Exception as e:
+                    logger.error(f"Failed to initialize LandingAI ADE: {e}")
+                    yield None
+                    return
+                self._count("clients_created")
+            self._count("checkouts")
+            try:
+                yield ade_client
+            finally:
+                if self.available:
+                    self._idle.put(ade_client)
+        finally:
+            self._slots.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(size=self.size, idle=self._idle.qsize(), available=self.available,
+                     cooldown_remaining=max(0.0, self._unavailable_until - time.monotonic()))
+        return stats
+
+_ADE_POOL: Optional[AdeClientPool] = None
+_ADE_POOL_LOCK = threading.Lock()
+
+def _new_ade_client():
+    return LandingAIADE(
+        apikey=Config.LANDINGAI_API_KEY,
+        environment="production"  # Use production environment
+    )
+
+def get_ade_pool() -> Optional[AdeClientPool]:
+    """Process-wide ADE client pool, or None if the SDK or API key is missing."""
+    global _ADE_POOL
     if not LANDINGAI_AVAILABLE:
         logger.warning("LandingAI ADE not available. Using fallback extraction.")
         return None
-        
     if not Config.is_landingai_available():
         logger.warning("LandingAI API key not configured. Using fallback extraction.")
         return None
-    
+    with _ADE_POOL_LOCK:
+        if _ADE_POOL is None:
+            _ADE_POOL = AdeClientPool(_new_ade_client, size=Config.LANDINGAI_CLIENT_POOL_SIZE,
+                                      wait=Config.LANDINGAI_CLIENT_WAIT,
+                                      auth_cooldown=Config.LANDINGAI_AUTH_COOLDOWN)
+        return _ADE_POOL
+
+@contextmanager
+def ade_client(wait: Optional[float] = None) -> Iterator[Optional[Any]]:
+    """Pooled LandingAI ADE client for one call, or None if ADE is unavailable."""
+    pool = get_ade_pool()
+    if pool is None:
+        yield None
+        return
+    with pool.client(wait) as client:
+        yield client
+
+def get_ade_client():
+    """
+    A dedicated (not pooled) LandingAI ADE client, or None if ADE is unavailable
+    (e.g. cooling down after a 401); the caller owns it. Prefer ade_client(),
+    which reuses pooled clients
+    """
+    pool = get_ade_pool()
+    if pool is None or not pool.available:
+        return None
     try:
-        # Initialize LandingAI ADE client with the API key
-        logger.info("Initializing LandingAI ADE with API key")
-        client = LandingAIADE(
-            apikey=Config.LANDINGAI_API_KEY,
-            environment="production"  # Use production environment
-        )
-        return client
+        return _new_ade_client()
     except Exception as e:
         logger.error(f"Failed to initialize LandingAI ADE: {e}")
         return None
 
-def extract_fields(pdf_path: str) -> List[ContractField]:
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide extraction cache (SQLite file shared by all workers)."""
+    global _EXTRACTION_CACHE
+    with _EXTRACTION_CACHE_LOCK:
+        if _EXTRACTION_CACHE is None:
+            db_path = Config.EXTRACTION_CACHE_PATH or Path(__file__).resolve().parent / ".extraction_cache" / "extractions.sqlite3"
+            _EXTRACTION_CACHE = ExtractionCache(db_path,
+                                                memory_bytes=Config.EXTRACTION_CACHE_MEMORY_MB << 20,
+                                                disk_bytes=Config.EXTRACTION_CACHE_DISK_MB << 20)
+        return _EXTRACTION_CACHE
+
+@contextmanager
+def _parse_locked(digest: str) -> Iterator[None]:
+    """Hold the digest's parse lock; the entry is dropped when its last holder or waiter leaves."""
+    with _PARSE_LOCKS_GUARD:
+        entry = _PARSE_LOCKS.get(digest)
+        if entry is None:
+            entry = _PARSE_LOCKS[digest] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _PARSE_LOCKS_GUARD:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _PARSE_LOCKS[digest]
+
+def parse_document(pdf_path: str, strict: bool = False) -> Optional[ParsedDocument]:
     """
-    Extract structured fields from contract PDF using LandingAI ADE
-    Falls back to basic extraction if ADE is not available
+    Parse a document with LandingAI ADE, once per distinct file content
+    Returns None if ADE is not configured; if it is but the parse fails, returns
+    None or, with strict=True, raises AdeExtractionError
     """
-    logger.info(f"Extracting fields from: {pdf_path}")
-    
-    # Check cache first
-    cache_key = hashlib.md5(f"fields_{pdf_path}".encode()).hexdigest()
-    if cache_key in _landingai_cache:
-        cache_entry = _landingai_cache[cache_key]
-        if time.time() - cache_entry['timestamp'] < CACHE_TTL:
-            logger.info("Returning cached field extraction results")
-            return cache_entry['data']
+    try:
+        digest = file_digest(Path(pdf_path))
+    except OSError:
+        digest = None  # not a local file (e.g. a URL): parse without caching
+    cache = get_extraction_cache()
+    cache_key = ExtractionCache.key(digest, "parse", EXTRACTOR_VERSION) if digest else None
+    if cache_key is None:
+        return _parse_with_ade(pdf_path, None, strict)
     
-    # Try LandingAI ADE first
-    ade_client = get_ade_client()
-    if ade_client:
+    # Concurrent requests for the same document wait for the first parse instead of repeating it
+    with _parse_locked(digest):
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached document parse")
+            return ParsedDocument.from_dict(cached)
+        document = _parse_with_ade(pdf_path, digest, strict)
+        # Failures are not cached, so the document is parsed again once ADE recovers
+        if document is not None:
+            cache.put(cache_key, document.to_dict())
+        return document
+
+def _parse_with_ade(pdf_path: str, digest: Optional[str], strict: bool = False) -> Optional[ParsedDocument]:
+    with ade_client() as client:
+        if client is None:
+            pool = get_ade_pool()
+            if strict and pool is not None:
+                # Configured but cooling down after a 401 (not retryable) or no client free (retryable)
+                raise AdeExtractionError("LandingAI ADE client unavailable", retryable=pool.available)
+            return None
         try:
-            result = extract_with_ade(ade_client, pdf_path)
-            # Cache the result
-            _landingai_cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
-            return result
+            logger.info(f"Using LandingAI ADE to analyze: {pdf_path}")
+            _ADE_RATE.acquire()
+            
+            # Use the actual LandingAI ADE API
+            response = client.parse(
+                document_url=pdf_path,
+                model="dpt-2-latest"
+            )
+            return ParsedDocument.from_ade_response(response, digest)
         except Exception as e:
-            logger.error(f"ADE extraction failed: {e}")
-            logger.info("Falling back to basic extraction")
-    
-    # Fallback to basic extraction
-    result = extract_basic_fields(pdf_path)
-    # Cache the fallback result too
-    _landingai_cache[cache_key] = {
-        'data': result,
-        'timestamp': time.time()
-    }
-    return result
+            logger.error(f"LandingAI ADE extraction error: {e}")
+            # Check if it's an authentication error
+            if "401" in str(e) or "Unauthorized" in str(e) or "Invalid API Key" in str(e):
+                logger.error("LandingAI API key is invalid or expired. Please check your API key.")
+                get_ade_pool().mark_unauthorized()
+            if strict:
+                raise _ade_error(e) from e
+            return None
 
-def extract_with_ade(ade_client, pdf_path: str) -> List[ContractField]:
-    """
-    Extract fields using LandingAI ADE with DPT-2 model
-    """
-    try:
-        logger.info(f"Using LandingAI ADE to analyze: {pdf_path}")
-        
-        # Use the actual LandingAI ADE API
-        response = ade_client.parse(
-            document_url=pdf_path,
-            model="dpt-2-latest"
-        )
-        
-        # Extract fields from the response chunks
-        fields = []
-        
-        # Define field mapping for compliance analysis
-        field_mapping = {
-            "jurisdiction": ["governing law", "jurisdiction", "applicable law"],
-            "data_processing": ["data processing", "personal data", "GDPR"],
-            "termination_notice": ["termination", "notice period", "termination notice"],
-            "tax_withholding_clause": ["tax", "withholding", "tax withholding"],
-            "privacy_policy_reference": ["privacy", "privacy policy", "data protection"],
-            "labor_law_compliance": ["labor", "employment", "worker"],
-            "intellectual_property": ["intellectual property", "IP", "patent", "copyright"],
-            "liability_limitation": ["liability", "limitation", "exclusion"],
-            "confidentiality": ["confidential", "non-disclosure", "NDA"],
-            "force_majeure": ["force majeure", "act of god", "unforeseen"]
-        }
-        
-        # Process chunks from ADE response
-        for chunk in response.chunks:
-            chunk_text = chunk.text.lower() if hasattr(chunk, 'text') else str(chunk).lower()
-            
-            # Match chunks to compliance fields
-            for field_name, keywords in field_mapping.items():
-                if any(keyword in chunk_text for keyword in keywords):
-                    # Extract the actual text from the chunk
-                    extracted_value = chunk.text if hasattr(chunk, 'text') else str(chunk)
-                    
-                    # Get page number if available
-                    page_num = getattr(chunk, 'page', 1)
-                    
-                    evidence = Evidence(
-                        file=pdf_path,
-                        page=page_num,
-                        section="LandingAI ADE"
-                    )
-                    
-                    fields.append(ContractField(
-                        name=field_name,
-                        value=extracted_value.strip(),
-                        evidence=evidence
-                    ))
-                    break  # Only match each chunk to one field
-        
-        # If no fields were extracted, provide some default enhanced results
-        if not fields:
-            logger.info("No specific fields extracted, providing enhanced defaults")
-            enhanced_results = [
-                ContractField(
-                    name="jurisdiction", 
-                    value="European Union (GDPR applicable)", 
-                    evidence=Evidence(file=pdf_path, page=1, section="LandingAI ADE")
-                ),
-                ContractField(
-                    name="data_processing", 
-                    value="Data Controller and Processor roles defined with GDPR compliance", 
-                    evidence=Evidence(file=pdf_path, page=2, section="LandingAI ADE")
-                ),
-                ContractField(
-                    name="termination_notice", 
-                    value="30 days written notice required for termination", 
-                    evidence=Evidence(file=pdf_path, page=3, section="LandingAI ADE")
-                ),
-                ContractField(
-                    name="tax_withholding_clause", 
-                    value="Standard EU tax withholding rates apply", 
-                    evidence=Evidence(file=pdf_path, page=4, section="LandingAI ADE")
-                )
-            ]
-            fields = enhanced_results
-        
-        logger.info(f"LandingAI ADE extracted {len(fields)} fields")
-        return fields
-        
-    except Exception as e:
-        logger.error(f"LandingAI ADE extraction error: {e}")
-        # Check if it's an authentication error
-        if "401" in str(e) or "Unauthorized" in str(e) or "Invalid API Key" in str(e):
-            logger.error("LandingAI API key is invalid or expired. Please check your API key.")
-        # Fallback to enhanced results if ADE fails
-        logger.info("Falling back to enhanced extraction due to ADE error")
-        return extract_basic_fields(pdf_path)
+def _use_ade() -> bool:
+    return Config.EXTRACTION_BACKEND != "local"
 
-def parse_table_content(content: str) -> Dict[str, Any]:
+def extract_fields(pdf_path: str, strict: bool = False) -> List[ContractField]:
     """
-    Parse table content from text into headers and rows
+    Extract structured fields from contract PDF using LandingAI ADE
+    Falls back to local (pypdf) extraction if ADE is not available, which is
+    also the only extractor with EXTRACTION_BACKEND=local; with strict=True a
+    configured ADE that fails raises AdeExtractionError instead (for retrying callers)
     """
-    try:
-        lines = content.strip().split('\n')
-        if not lines:
-            return {"headers": [], "rows": []}
-        
-        # Find the first non-empty line as headers
-        headers = []
-        rows = []
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Split by pipe, tab, or multiple spaces
-            if '|' in line:
-                cells = [cell.strip() for cell in line.split('|') if cell.strip()]
-            elif '\t' in line:
-                cells = [cell.strip() for cell in line.split('\t') if cell.strip()]
-            else:
-                # Try to split by multiple spaces
-                cells = [cell.strip() for cell in line.split() if cell.strip()]
-            
-            if not cells:
-                continue
-                
-            if i == 0:  # First line is headers
-                headers = cells
-            else:  # Subsequent lines are rows
-                rows.append(cells)
-        
-        return {"headers": headers, "rows": rows}
-        
-    except Exception as e:
-        logger.error(f"Error parsing table content: {e}")
-        return {"headers": [], "rows": []}
+    logger.info(f"Extracting fields from: {pdf_path}")
+    
+    if _use_ade():
+        document = parse_document(pdf_path, strict=strict)
+        if document is not None:
+            fields = document.fields(pdf_path)
+            logger.info(f"LandingAI ADE extracted {len(fields)} fields")
+            return fields
+    
+    fields = extract_fields_locally(pdf_path)
+    if fields is not None:
+        return fields
+    
+    # Fallback to basic extraction (no extractable text, e.g. a scanned PDF)
+    logger.info("Falling back to basic extraction")
+    return extract_basic_fields(pdf_path)
 
 def extract_basic_fields(pdf_path: str) -> List[ContractField]:
     """
@@ -292,109 +395,16 @@ def extract_tables(pdf_path: str) -> List[Dict[str, Any]]:
     """
     logger.info(f"Extracting tables from: {pdf_path}")
     
-    # Check cache first
-    cache_key = hashlib.md5(f"tables_{pdf_path}".encode()).hexdigest()
-    if cache_key in _landingai_cache:
-        cache_entry = _landingai_cache[cache_key]
-        if time.time() - cache_entry['timestamp'] < CACHE_TTL:
-            logger.info("Returning cached table extraction results")
-            return cache_entry['data']
+    # pypdf text carries no table structure, so tables need ADE
+    if not _use_ade():
+        return []
     
-    ade_client = get_ade_client()
-    if not ade_client:
+    # Shares the parse made for extract_fields on the same document
+    document = parse_document(pdf_path)
+    if document is None:
         logger.warning("LandingAI ADE not available for table extraction")
         return []
     
-    try:
-        logger.info(f"Using LandingAI ADE for table extraction from: {pdf_path}")
-        
-        # Use the actual LandingAI ADE API for table extraction
-        response = ade_client.parse(
-            document_url=pdf_path,
-            model="dpt-2-latest"
-        )
-        
-        tables = []
-        
-        # Process chunks to find table-like structures
-        for chunk in response.chunks:
-            chunk_text = chunk.text if hasattr(chunk, 'text') else str(chunk)
-            
-            # Look for table-like patterns (rows with multiple columns)
-            if '|' in chunk_text or '\t' in chunk_text or 'table' in chunk_text.lower():
-                # Parse table content into headers and rows
-                parsed_table = parse_table_content(chunk_text)
-                
-                # Extract table structure
-                table_data = {
-                    "table_id": f"table_{len(tables) + 1}",
-                    "title": f"Extracted Table {len(tables) + 1}",
-                    "headers": parsed_table.get("headers", []),
-                    "rows": parsed_table.get("rows", []),
-                    "content": chunk_text,
-                    "page": getattr(chunk, 'page', 1),
-                    "confidence": 0.9
-                }
-                tables.append(table_data)
-        
-        # If no tables found, provide some realistic examples
-        if not tables:
-            logger.info("No tables detected, providing enhanced examples")
-            enhanced_tables = [
-                {
-                    "table_id": "compliance_matrix",
-                    "title": "GDPR Compliance Matrix",
-                    "headers": ["Requirement", "Status", "Evidence", "Risk Level"],
-                    "rows": [
-                        ["Data Processing Lawful Basis", "Compliant", "Article 6(1)(b)", "LOW"],
-                        ["Data Subject Rights", "Compliant", "Articles 15-22", "LOW"],
-                        ["Cross-border Transfer", "Needs Review", "SCCs Required", "MEDIUM"],
-                        ["Data Breach Notification", "Compliant", "Article 33", "LOW"]
-                    ],
-                    "content": "Requirement | Status | Evidence | Risk Level\nData Processing Lawful Basis | Compliant | Article 6(1)(b) | LOW\nData Subject Rights | Compliant | Articles 15-22 | LOW\nCross-border Transfer | Needs Review | SCCs Required | MEDIUM\nData Breach Notification | Compliant | Article 33 | LOW",
-                    "page": 3,
-                    "confidence": 0.95
-                },
-                {
-                    "table_id": "tax_withholding",
-                    "title": "Tax Withholding Schedule", 
-                    "headers": ["Country", "Rate", "Treaty Benefit", "Documentation"],
-                    "rows": [
-                        ["Germany", "15%", "Yes", "W-8BEN"],
-                        ["France", "15%", "Yes", "W-8BEN"],
-                        ["UK", "20%", "No", "Local Certificate"],
-                        ["Italy", "15%", "Yes", "W-8BEN"]
-                    ],
-                    "content": "Country | Rate | Treaty Benefit | Documentation\nGermany | 15% | Yes | W-8BEN\nFrance | 15% | Yes | W-8BEN\nUK | 20% | No | Local Certificate\nItaly | 15% | Yes | W-8BEN",
-                    "page": 5,
-                    "confidence": 0.88
-                },
-                {
-                    "table_id": "risk_assessment",
-                    "title": "Compliance Risk Assessment",
-                    "headers": ["Risk Category", "Probability", "Impact", "Mitigation"],
-                    "rows": [
-                        ["Data Privacy", "Medium", "High", "GDPR Compliance"],
-                        ["Tax Compliance", "Low", "Medium", "Treaty Benefits"],
-                        ["Labor Law", "Low", "High", "EU Standards"],
-                        ["IP Protection", "Low", "Medium", "Standard Clauses"]
-                    ],
-                    "content": "Risk Category | Probability | Impact | Mitigation\nData Privacy | Medium | High | GDPR Compliance\nTax Compliance | Low | Medium | Treaty Benefits\nLabor Law | Low | High | EU Standards\nIP Protection | Low | Medium | Standard Clauses",
-                    "page": 7,
-                    "confidence": 0.92
-                }
-            ]
-            tables = enhanced_tables
-        
-        # Cache the result
-        _landingai_cache[cache_key] = {
-            'data': tables,
-            'timestamp': time.time()
-        }
-        
-        logger.info(f"LandingAI ADE extracted {len(tables)} tables")
-        return tables
-        
-    except Exception as e:
-        logger.error(f"Table extraction failed: {e}")
-        return []
\ No newline at end of file
+    tables = document.tables()
+    logger.info(f"LandingAI ADE extracted {len(tables)} tables")
+    return tables
@@ -0,0 +1,97 @@
+"""
+Local contract extraction with pypdf (no network)
+Per-page text comes from the shared PDF text cache, which extracts large PDFs
+as page ranges on a process pool; pages are segmented into clauses and the
+clauses are mapped to the same field names as ADE results
+"""
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from models.schemas import ContractField
+from parsed_document import ParsedDocument
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SOURCE = "Local extraction"
+
+# A clause starts at "Section 4", "Article IV", "Clause 2", "1. Term", "12.3 Termination"
+# or an all-caps heading line
+_NUMBERED_HEADING_RE = re.compile(
+    r"^\s*(?:(?:section|article|clause)\s+[0-9ivxlc]+\b"
+    r"|\d{1,3}(?:\.\d{1,3})*[.)]\s+[A-Z]"
+    r"|\d{1,3}(?:\.\d{1,3})+\s+[A-Z])",
+    re.IGNORECASE,
+)
+_CAPS_HEADING_RE = re.compile(r"^\s*[A-Z][A-Z0-9 ,&/'()-]{3,}$")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+_WHITESPACE_RE = re.compile(r"\s+")
+_MAX_SECTION_LEN = 80
+
+
+def _is_heading(line: str) -> bool:
+    return bool(_NUMBERED_HEADING_RE.match(line) or _CAPS_HEADING_RE.match(line))
+
+
+def segment_clauses(pages: List[str]) -> List[Dict[str, Any]]:
+    """Split per-page text into clause chunks ({"text", "page", "type", "section"}).
+
+    A clause runs from one heading to the next; text at the top of a page that
+    precedes any heading continues the previous page's clause. Pages without
+    headings fall back to blank-line paragraphs.
+    """
+    clauses: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+
+    def close() -> None:
+        if current is not None:
+            text = _WHITESPACE_RE.sub(" ", "\n".join(current["lines"])).strip()
+            if text:
+                clauses.append({"text": text, "page": current["page"], "type": "clause",
+                                "section": current["section"]})
+
+    for page_number, page_text in enumerate(pages, start=1):
+        lines = page_text.splitlines()
+        if not any(_is_heading(line) for line in lines):
+            paragraphs = [p for p in _BLANK_LINES_RE.split(page_text) if p.strip()]
+            if len(paragraphs) > 1:
+                # Paragraph breaks are the only structure on this page
+                for paragraph in paragraphs:
+                    close()
+                    current = {"lines": [paragraph], "page": page_number, "section": None}
+                continue
+        for line in lines:
+            if _is_heading(line):
+                close()
+                current = {"lines": [line], "page": page_number,
+                           "section": line.strip()[:_MAX_SECTION_LEN]}
+            elif current is None:
+                current = {"lines": [line], "page": page_number, "section": None}
+            else:
+                current["lines"].append(line)
+    close()
+    return clauses
+
+
+def parse_locally(pdf_path: str) -> Optional[ParsedDocument]:
+    """Clause-segmented document, or None if no text could be extracted (not a PDF, scanned, pypdf missing)."""
+    if Path(pdf_path).suffix.lower() != ".pdf":
+        return None
+    # Imported here: the pipeline module is heavy and the cache lives there
+    from pathway_pipeline import get_pdf_text_cache
+    pages = get_pdf_text_cache().pages(Path(pdf_path))
+    if not any(page.strip() for page in pages):
+        return None
+    return ParsedDocument(segment_clauses(pages), source=LOCAL_SOURCE)
+
+
+def extract_fields_locally(pdf_path: str) -> Optional[List[ContractField]]:
+    """Fields from the PDF's own text, with page numbers; None if the PDF has no extractable text."""
+    document = parse_locally(pdf_path)
+    if document is None:
+        return None
+    # No placeholder fields: a clause either matched a field name or it did not
+    fields = document.fields(pdf_path, defaults=False)
+    logger.info(f"Local extraction found {len(fields)} fields in {len(document.chunks)} clauses "
+                f"across {len(document.pages)} pages")
+    return fields
@@ -7,7 +7,7 @@ import logging
 from typing import Any, Dict, List, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent
-from ..landingai_client import extract_fields, extract_tables, get_ade_client
+from ..landingai_client import ade_client, extract_fields, extract_tables, get_ade_pool
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -110,14 +110,17 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     
     elif name == "check_ade_availability":
         try:
-            ade_client = get_ade_client()
-            is_available = ade_client is not None
+            # Borrow a pooled client briefly; never queue behind running extractions
+            with ade_client(wait=Config.LANDINGAI_AVAILABILITY_WAIT) as client:
+                is_available = client is not None
             config_available = Config.is_landingai_available()
+            pool = get_ade_pool()
             
             result = {
                 "ade_available": is_available,
                 "config_available": config_available,
-                "api_key_configured": Config.LANDINGAI_API_KEY is not None
+                "api_key_configured": Config.LANDINGAI_API_KEY is not None,
+                "client_pool": pool.get_stats() if pool is not None else None
             }
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
             
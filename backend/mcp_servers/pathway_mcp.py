@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from ..pathway_pipeline import start_pipeline, add_rule_file, add_contract_file, add_rule_text
+from ..pathway_client import pathway_client
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -136,13 +137,15 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     
     elif name == "check_pipeline_status":
         try:
-            # This would check the actual pipeline status
-            # For now, we'll return a basic status
+            # Ask the retrieval server itself over the shared keep-alive pool
+            statistics = pathway_client.server_statistics()
             result = {
                 "success": True,
-                "pipeline_status": "running",
+                "pipeline_status": "running" if statistics is not None else "fallback",
                 "pathway_available": Config.is_pathway_available(),
-                "message": "Pathway pipeline is operational"
+                "server_statistics": statistics,
+                "message": "Pathway pipeline is operational" if statistics is not None
+                           else "Pathway server unreachable, serving from the local index"
             }
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
             
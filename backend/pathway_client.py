@@ -0,0 +1,432 @@
+"""
+Client for the Pathway retrieval server
+Wraps the /v1/retrieve leg of hybrid_search in a circuit breaker with a
+background health probe, so the fallback is taken instantly while the
+server is known to be down or still booting. Requests go over a small pool
+of persistent HTTP/1.1 connections, so connection setup is paid once per
+connection rather than once per query
+"""
+import asyncio
+import http.client
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional, Tuple
+
+# Importable both from the backend directory and as backend.pathway_client
+if __package__:
+    from .config import Config
+    from .search_index import SearchHit
+else:
+    from config import Config
+    from search_index import SearchHit
+
+# httpx is only needed by the asyncio path; without it async calls use a worker thread
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker guarding calls to a flaky dependency"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """True if a call may go through; half-open admits a single trial call."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def cancel_trial(self) -> None:
+        """An admitted call never reached the server: free the half-open trial without a verdict."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def mark_healthy(self) -> None:
+        """Health probe succeeded: let the next real request through as a trial."""
+        with self._lock:
+            if self._state == self.OPEN:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+
+class PoolExhausted(Exception):
+    """No local connection slot freed up in time; says nothing about the server"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections to a single host"""
+
+    # Errors meaning a pooled connection was closed by the server while idle
+    _STALE_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                     ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, base_url: str, size: int = 8,
+                 connect_timeout: float = 1.0, read_timeout: float = 2.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self._conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.size = size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._stats = {"connections_opened": 0, "connections_reused": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _connect(self) -> http.client.HTTPConnection:
+        conn = self._conn_class(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        # Connect and read deadlines differ; the socket keeps the read one from here on
+        conn.sock.settimeout(self.read_timeout)
+        self._count("connections_opened")
+        return conn
+
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect(), False
+        self._count("connections_reused")
+        return conn, True
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """Send one request and return (status, body bytes)."""
+        headers = dict(headers or {})
+        # Callers queue for a connection for at most one read timeout
+        if not self._slots.acquire(timeout=self.read_timeout):
+            raise PoolExhausted("no free Pathway connection")
+        try:
+            conn, reused = self._checkout()
+            try:
+                try:
+                    conn.request(method, self.base_path + path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                except self._STALE_ERRORS:
+                    if not reused:
+                        raise
+                    # The server dropped an idle connection; retry once on a fresh one
+                    conn.close()
+                    conn = self._connect()
+                    conn.request(method, self.base_path + path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                data = resp.read()
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+            return resp.status, data
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["idle_connections"] = self._idle.qsize()
+        stats["pool_size"] = self.size
+        return stats
+
+
+class PathwayClient:
+    """Pathway /v1/retrieve client with circuit breaker and health probe"""
+
+    def __init__(self, base_url: str = Config.PATHWAY_SERVER_URL,
+                 timeout: float = Config.PATHWAY_TIMEOUT,
+                 probe_interval: float = Config.PATHWAY_PROBE_INTERVAL,
+                 max_batch_workers: int = Config.PATHWAY_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.max_batch_workers = max_batch_workers
+        self.timeout = timeout
+        self.pool = ConnectionPool(
+            self.base_url, size=max_batch_workers,
+            connect_timeout=Config.PATHWAY_CONNECT_TIMEOUT, read_timeout=timeout,
+        )
+        self.probe_interval = probe_interval
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.PATHWAY_FAILURE_THRESHOLD,
+            reset_timeout=Config.PATHWAY_RESET_TIMEOUT,
+        )
+        self._stats = {"requests": 0, "successes": 0, "failures": 0, "short_circuited": 0,
+                       "shed": 0, "probes": 0, "probe_failures": 0}
+        self._stats_lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+        # Fans out retrieve_many batches; never wider than the connection pool
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        self._batch_executor_lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        # Outcome of the most recent /v1/statistics call, served to pollers by last_probe()
+        self._last_probe: Dict[str, Any] = {"reachable": None, "statistics": None, "probed_at": None}
+        self._last_probe_lock = threading.Lock()
+        self._refreshing = False
+        # httpx.AsyncClient is bound to the event loop that first used it
+        self._async_client = None
+        self._async_loop = None
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _request_json(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        status, data = self.pool.request(method, path, body=body, headers=headers)
+        if status >= 400:
+            raise http.client.HTTPException(f"HTTP {status} from {path}")
+        # json.loads detects the encoding of bytes itself; no intermediate str copy
+        return json.loads(data)
+
+    def _post_json(self, path: str, payload: Dict[str, Any]) -> Any:
+        return self._request_json("POST", path, payload)
+
+    def _get_json(self, path: str) -> Any:
+        return self._request_json("GET", path)
+
+    def retrieve(self, query: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        """Query the Pathway server; None means the caller should use the fallback."""
+        if not self.breaker.allow_request():
+            self._count("short_circuited")
+            return None
+        return self._retrieve_admitted(query, k)
+
+    def _retrieve_admitted(self, query: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        self._count("requests")
+        try:
+            data = self._post_json("/v1/retrieve", {"query": query, "k": k})
+        except PoolExhausted:
+            return self._shed()
+        except Exception as e:
+            return self._failed(e)
+        return self._succeeded(data)
+
+    def _shed(self) -> None:
+        # Local contention, not a server failure: fall back without touching the breaker's count
+        self._count("shed")
+        self.breaker.cancel_trial()
+        return None
+
+    def _failed(self, error: Exception) -> None:
+        self._count("failures")
+        self.breaker.record_failure()
+        logger.info(f"Pathway server not available, using enhanced search: {error}")
+        return None
+
+    def _succeeded(self, data: Any) -> Optional[List[Tuple[str, float]]]:
+        self.breaker.record_success()
+        self._count("successes")
+        if isinstance(data, dict) and "results" in data:
+            return [
+                SearchHit(it["text"], float(it["score"]), source=(it.get("metadata") or {}).get("path"))
+                for it in data.get("results", [])
+            ]
+        return None
+
+    def retrieve_many(self, queries: List[str], k: int) -> List[Optional[List[Tuple[str, float]]]]:
+        """Retrieve a batch of queries concurrently; None entries fall back individually.
+
+        /v1/retrieve takes one query per request, so the batch is fanned out
+        over a small thread pool and costs one round-trip of wall time.
+        """
+        if len(queries) <= 1:
+            return [self.retrieve(q, k) for q in queries]
+        if not self.breaker.allow_request():
+            with self._stats_lock:
+                self._stats["short_circuited"] += len(queries)
+            return [None] * len(queries)
+        # The first query doubles as the breaker trial; skip the rest if it fails
+        first = self._retrieve_admitted(queries[0], k)
+        if first is None:
+            return [first] + [None] * (len(queries) - 1)
+        rest = list(self._get_batch_executor().map(lambda q: self._retrieve_admitted(q, k), queries[1:]))
+        return [first] + rest
+
+    def _get_batch_executor(self) -> ThreadPoolExecutor:
+        with self._batch_executor_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(max_workers=max(1, self.pool.size),
+                                                          thread_name_prefix="pathway-retrieve")
+            return self._batch_executor
+
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=Config.PATHWAY_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=self.max_batch_workers,
+                                    max_keepalive_connections=self.max_batch_workers),
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    async def _async_retrieve_admitted(self, query: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self._retrieve_admitted, query, k)
+        self._count("requests")
+        try:
+            response = await self._get_async_client().post("/v1/retrieve", json={"query": query, "k": k})
+            response.raise_for_status()
+            data = json.loads(response.content)
+        except httpx.PoolTimeout:
+            return self._shed()
+        except Exception as e:
+            return self._failed(e)
+        return self._succeeded(data)
+
+    async def async_retrieve_many(self, queries: List[str], k: int) -> List[Optional[List[Tuple[str, float]]]]:
+        """asyncio counterpart of retrieve_many; never blocks the event loop on the network."""
+        if not queries:
+            return []
+        if not self.breaker.allow_request():
+            with self._stats_lock:
+                self._stats["short_circuited"] += len(queries)
+            return [None] * len(queries)
+        first = await self._async_retrieve_admitted(queries[0], k)
+        if first is None:
+            return [first] + [None] * (len(queries) - 1)
+        rest = await asyncio.gather(*(self._async_retrieve_admitted(q, k) for q in queries[1:]))
+        return [first] + list(rest)
+
+    def probe(self) -> bool:
+        """Hit /v1/statistics once and feed the result into the breaker."""
+        return self.server_statistics() is not None
+
+    def server_statistics(self) -> Optional[Dict[str, Any]]:
+        """The server's /v1/statistics payload, or None if it is unreachable."""
+        self._count("probes")
+        try:
+            data = self._get_json("/v1/statistics")
+        except PoolExhausted:
+            # Busy, not unreachable: keep the previous probe result
+            return None
+        except Exception:
+            self._count("probe_failures")
+            self._record_probe(None)
+            return None
+        self.breaker.mark_healthy()
+        data = data if isinstance(data, dict) else {}
+        self._record_probe(data)
+        return data
+
+    def _record_probe(self, statistics: Optional[Dict[str, Any]]) -> None:
+        with self._last_probe_lock:
+            self._last_probe = {"reachable": statistics is not None, "statistics": statistics,
+                                "probed_at": time.time()}
+
+    def last_probe(self) -> Dict[str, Any]:
+        """Most recent /v1/statistics outcome plus breaker state, without waiting on the network.
+
+        A result older than probe_interval is refreshed on a background
+        thread while the breaker is closed; while it is not, the health
+        probe keeps it current.
+        """
+        breaker_state = self.breaker.state
+        with self._last_probe_lock:
+            result = dict(self._last_probe)
+            probed_at = result["probed_at"]
+            stale = probed_at is None or time.time() - probed_at >= self.probe_interval
+            refresh = stale and not self._refreshing and breaker_state == CircuitBreaker.CLOSED
+            if refresh:
+                self._refreshing = True
+        if refresh:
+            threading.Thread(target=self._refresh_statistics, name="pathway-statistics", daemon=True).start()
+        result["breaker_state"] = breaker_state
+        return result
+
+    def _refresh_statistics(self) -> None:
+        try:
+            self.server_statistics()
+        finally:
+            with self._last_probe_lock:
+                self._refreshing = False
+
+    def start_health_probe(self) -> None:
+        """Idempotent: probe the server in the background while the breaker is not closed."""
+        with self._probe_lock:
+            if self._probe_thread is not None:
+                return
+            self._probe_thread = threading.Thread(target=self._probe_loop, name="pathway-health", daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                self.probe()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["breaker_state"] = self.breaker.state
+        stats["connections"] = self.pool.get_stats()
+        return stats
+
+# Global instance
+pathway_client = PathwayClient()
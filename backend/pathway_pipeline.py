@@ -1,35 +1,397 @@
 # Pathway live ingestion + hybrid index with safe fallback.
 from __future__ import annotations
 from pathlib import Path
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import json
+import logging
 import threading
 
+# Sibling modules resolve both as top-level modules (cd backend; uvicorn app:app)
+# and inside the backend package (import backend.pathway_pipeline)
+if __package__:
+    from .config import Config
+    from . import jurisdiction
+    from .index_store import MappedSegment, load_snapshot, write_snapshot
+    from .chunking import breadcrumb, chunk_markdown
+    from .dense_index import DenseIndex
+    from .file_watcher import FileWatcher
+    from .pdf_text import PdfTextCache
+    from .search_index import ShardedIndex, SearchHit, tokenize
+    from .pathway_client import CircuitBreaker, pathway_client
+    from .query_cache import QueryCache
+    from .rule_store import RuleStore
+else:
+    from config import Config
+    import jurisdiction
+    from index_store import MappedSegment, load_snapshot, write_snapshot
+    from chunking import breadcrumb, chunk_markdown
+    from dense_index import DenseIndex
+    from file_watcher import FileWatcher
+    from pdf_text import PdfTextCache
+    from search_index import ShardedIndex, SearchHit, tokenize
+    from pathway_client import CircuitBreaker, pathway_client
+    from query_cache import QueryCache
+    from rule_store import RuleStore
+
+logger = logging.getLogger(__name__)
+
 # ---------------- Fallback store (works even without Pathway) ----------------
-_FALLBACK_RULES: List[str] = []
+# Ingested rule texts, deduplicated by content and replaced per source path
+_FALLBACK_RULES = RuleStore()
+
+# Resident inverted index over rules + contracts, built once and kept current
+# by the ingestion functions below; partitioned into per-jurisdiction shards
+# plus a global shard for chunks that name no jurisdiction.
+_INDEX = ShardedIndex({**jurisdiction.REGION_BITS, ShardedIndex.GLOBAL_SHARD: jurisdiction.GLOBAL})
+_INDEX_BUILT = False
+_INDEX_LOCK = threading.RLock()
+
+_RULES_DIR_CANDIDATES = [
+    Path("backend/rules"),
+    Path("rules"),
+    Path("../../backend/rules"),
+    Path("../../../backend/rules"),
+    Path("/Users/aryakulkarni/Downloads/compliance-copilot/backend/rules")
+]
+_CONTRACTS_DIR = Path("backend/contracts")
+
+# Local embedding index over the same chunks (no-op without numpy/sentence-transformers)
+_DENSE = DenseIndex(Config.DENSE_EMBEDDING_MODEL, Config.DENSE_INDEX_DTYPE, Config.DENSE_BATCH_SIZE)
+_DENSE_LOCK = threading.Lock()
+_DENSE_LOADED = False
+
+def _find_rules_dir() -> Optional[Path]:
+    for path in _RULES_DIR_CANDIDATES:
+        if path.exists():
+            return path
+    return None
+
+def _doc_id(path: Path) -> str:
+    try:
+        return str(path.resolve())
+    except OSError:
+        return str(path)
+
+def _index_dir() -> Optional[Path]:
+    if Config.SEARCH_INDEX_DIR:
+        return Path(Config.SEARCH_INDEX_DIR)
+    rules_dir = _find_rules_dir()
+    return rules_dir.parent / ".search_index" if rules_dir else None
+
+def _dense_dir() -> Optional[Path]:
+    index_dir = _index_dir()
+    return index_dir.parent / ".embeddings" if index_dir else None
+
+def _embedding_text(doc: dict) -> str:
+    parents = breadcrumb(doc["meta"].get("heading_path") or [])
+    return f"{parents}\n{doc['text']}" if parents else doc["text"]
+
+def refresh_dense_index() -> None:
+    """Embed any new/changed chunks (content-hash cache) and persist the matrix."""
+    global _DENSE_LOADED
+    if not (Config.DENSE_INDEX_ENABLED and _DENSE.available):
+        return
+    with _DENSE_LOCK:
+        dense_dir = _dense_dir()
+        if not _DENSE_LOADED and dense_dir is not None:
+            _DENSE.load(dense_dir)
+            _DENSE_LOADED = True
+        chunks, tags = {}, {}
+        for doc_id in _INDEX.doc_ids():
+            doc = _INDEX.get_document(doc_id)
+            if doc is not None:
+                chunks[doc_id] = _embedding_text(doc)
+                tags[doc_id] = _INDEX.tag_mask(doc_id)
+        try:
+            embedded = _DENSE.sync(chunks, tags)
+        except Exception as e:
+            logger.warning(f"Dense index refresh failed: {e}")
+            return
+        if embedded and dense_dir is not None:
+            _DENSE.save(dense_dir)
+        logger.info(f"Dense index ready with {len(_DENSE)} chunks ({embedded} newly embedded)")
+
+def _refresh_dense_in_background() -> None:
+    if Config.DENSE_INDEX_ENABLED and _DENSE.available:
+        threading.Thread(target=refresh_dense_index, name="dense-index", daemon=True).start()
+
+_PDF_TEXT: Optional[PdfTextCache] = None
+_PDF_TEXT_LOCK = threading.Lock()
+
+def get_pdf_text_cache() -> PdfTextCache:
+    """Process-wide per-page PDF text cache, stored next to the search index."""
+    global _PDF_TEXT
+    with _PDF_TEXT_LOCK:
+        if _PDF_TEXT is None:
+            directory = Config.PDF_TEXT_CACHE_DIR
+            if not directory:
+                index_dir = _index_dir()
+                directory = index_dir.parent / ".pdf_text" if index_dir else None
+            _PDF_TEXT = PdfTextCache(directory, max_workers=Config.PDF_EXTRACT_WORKERS)
+        return _PDF_TEXT
+
+def _decode_file(p: Path, data: bytes, doc_type: str) -> Optional[str]:
+    if doc_type == "contract":
+        try:
+            return str(json.loads(data))
+        except Exception as e:
+            logger.warning(f"Error reading {p}: {e}")
+            return None
+    return data.decode("utf-8", errors="ignore")
+
+def _index_text(text: str, heading_path: List[str]) -> Optional[str]:
+    parents = heading_path[:-1]
+    return "\n".join("# " + h for h in parents) + "\n" + text if parents else None
+
+def _rule_chunks(text: str) -> List[dict]:
+    """Heading-delimited sections; parent headings are indexed with each section."""
+    chunks = []
+    for chunk in chunk_markdown(text):
+        chunks.append({
+            "text": chunk["text"],
+            "index_text": _index_text(chunk["text"], chunk["heading_path"]),
+            "meta": {k: chunk[k] for k in ("heading_path", "start", "end", "byte_start", "byte_end")},
+        })
+    return chunks
+
+def _pdf_chunks(pages: List[str]) -> List[dict]:
+    """One chunk per non-empty page, carrying its 1-based page number."""
+    return [{"text": page, "meta": {"page": n}} for n, page in enumerate(pages, start=1) if page.strip()]
+
+def _section_mask(text: str, heading_path: List[str], file_mask: int) -> int:
+    parents = breadcrumb(heading_path)
+    return jurisdiction.narrow(file_mask, jurisdiction.classify(f"{parents}\n{text}" if parents else text))
+
+def _tag_chunks(chunks: List[dict], text: str) -> List[dict]:
+    """Record each chunk's jurisdiction bitmask in its meta.
+
+    The mask is computed for the whole file text; each chunk (with its parent
+    headings) can only narrow it, so sections of an EU-only file stay EU-only.
+    """
+    file_mask = jurisdiction.classify(text)
+    for chunk in chunks:
+        chunk["meta"]["jurisdictions"] = _section_mask(chunk["text"], chunk["meta"].get("heading_path") or [], file_mask)
+    return chunks
+
+def _chunks_for(text: str, doc_type: str) -> List[dict]:
+    if doc_type == "contract":
+        return [{"text": text, "meta": {"start": 0, "end": len(text)}}]
+    return _rule_chunks(text)
+
+def _index_file(p: Path, doc_type: str, known_unchanged: bool = True,
+                catalog_entry: Optional[dict] = None) -> Optional[str]:
+    """(Re-)index one file unless its mtime/size or content hash says it is unchanged.
+
+    catalog_entry is the file watcher's record for p; its hash lets an
+    unchanged file be skipped without reading it again.
+    Returns the file text when it was (re-)indexed, None otherwise.
+    """
+    group = _doc_id(p)
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    previous = _INDEX.get_source(group)
+    if known_unchanged and previous and previous["mtime"] == st.st_mtime and previous["size"] == st.st_size:
+        return None
+    if (known_unchanged and previous and catalog_entry and catalog_entry["sha256"] == previous["sha256"]
+            and catalog_entry["mtime"] == st.st_mtime and catalog_entry["size"] == st.st_size):
+        _INDEX.set_source(group, {k: catalog_entry[k] for k in ("mtime", "size", "sha256")})
+        return None
+    try:
+        data = p.read_bytes()
+    except OSError:
+        return None
+    source = {"mtime": st.st_mtime, "size": st.st_size, "sha256": hashlib.sha256(data).hexdigest()}
+    if known_unchanged and previous and previous["sha256"] == source["sha256"]:
+        _INDEX.set_source(group, source)
+        return None
+    if p.suffix.lower() == ".pdf":
+        pages = get_pdf_text_cache().pages(p, data, source["sha256"])
+        if not pages:
+            return None
+        text, chunks = "\n".join(pages), _pdf_chunks(pages)
+    else:
+        text = _decode_file(p, data, doc_type)
+        if text is None:
+            return None
+        chunks = _chunks_for(text, doc_type)
+    _INDEX.replace_group(group, _tag_chunks(chunks, text), doc_type, str(p), source=source)
+    return text
+
+def build_index(force: bool = False) -> None:
+    """Bring the resident search index up to date with the rules and contracts trees (once).
+
+    A persisted snapshot is memory-mapped first; only files whose mtime/size
+    and content hash differ from its manifest are re-read and re-tokenized.
+    """
+    global _INDEX_BUILT
+    with _INDEX_LOCK:
+        if _INDEX_BUILT and not force:
+            return
+        index_dir = _index_dir()
+        if index_dir is not None and not _INDEX_BUILT:
+            _load_registered_jurisdictions(index_dir)
+            for name, shard in _INDEX.shards.items():
+                segment = load_snapshot(index_dir / name)
+                if segment is not None:
+                    shard.attach_base(segment)
+                    logger.info(f"Mapped {name} search shard snapshot with {len(segment)} documents")
+
+        # The file watcher's catalog is the source of truth for what exists
+        seen = set()
+        if _find_rules_dir() is None:
+            logger.warning("No rules directory found")
+        for entry in get_file_watcher().documents():
+            file_path = Path(entry["path"])
+            if file_path.suffix.lower() not in _INDEXED_SUFFIXES[entry["type"]]:
+                continue
+            seen.add(_doc_id(file_path))
+            _index_file(file_path, entry["type"], known_unchanged=not force, catalog_entry=entry)
+
+        # Drop file-backed documents whose files were deleted while we were down
+        for group in _INDEX.sources():
+            if group not in seen and not Path(group).exists():
+                _INDEX.remove_group(group)
+
+        _INDEX_BUILT = True
+        logger.info(f"Search index ready with {len(_INDEX)} documents")
+        if _INDEX.dirty:
+            persist_index()
+        _refresh_dense_in_background()
+
+def persist_index() -> Optional[Path]:
+    """Write each changed shard to a new on-disk snapshot and remap it as its base segment."""
+    index_dir = _index_dir()
+    if index_dir is None:
+        return None
+    with _INDEX.lock:
+        for name, shard in _INDEX.shards.items():
+            if not shard.dirty:
+                continue
+            try:
+                snapshot_dir = write_snapshot(shard, index_dir / name)
+                shard.attach_base(MappedSegment(snapshot_dir), bump_version=False)
+            except Exception as e:
+                logger.warning(f"Failed to persist {name} search shard: {e}")
+                return None
+            logger.info(f"Persisted {name} search shard snapshot to {snapshot_dir}")
+    return index_dir
+
+_JURISDICTIONS_FILE = "jurisdictions.json"
+
+def _load_registered_jurisdictions(index_dir: Path) -> None:
+    """Re-create shards for jurisdictions added at runtime by add_jurisdiction_shard."""
+    try:
+        registered = json.loads((index_dir / _JURISDICTIONS_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    for code, keywords in registered.items():
+        bit = jurisdiction.register_region(code, keywords)
+        if code not in _INDEX.shards:
+            _INDEX.add_shard(code, bit)
+
+def add_jurisdiction_shard(code: str, keywords: List[str]) -> int:
+    """Add a search shard for a new jurisdiction without re-indexing the existing shards.
+
+    Existing chunks are re-tagged as at ingestion (file mask, narrowed per
+    section) and those tagged for the new region are copied into the new
+    shard; later ingestion tags and routes chunks for it like any other
+    region. Returns the number of chunks placed.
+    """
+    build_index()
+    code = code.upper()
+    with _INDEX_LOCK:
+        if code in _INDEX.shards:
+            raise ValueError(f"jurisdiction {code} already has a shard")
+        bit = jurisdiction.register_region(code, keywords)
+        by_group: Dict[str, List[Tuple[str, dict]]] = {}
+        for doc_id in _INDEX.doc_ids():
+            doc = _INDEX.get_document(doc_id)
+            if doc is not None:
+                by_group.setdefault(doc["group"], []).append((doc_id, doc))
+        entries = []
+        for group, docs in by_group.items():
+            # A file's chunks cover its text, so their concatenation stands in for the file
+            file_mask = jurisdiction.classify("\n".join(doc["text"] for _, doc in docs))
+            for doc_id, doc in docs:
+                meta = dict(doc["meta"])
+                heading_path = meta.get("heading_path") or []
+                if not _section_mask(doc["text"], heading_path, file_mask) & bit:
+                    continue
+                meta["jurisdictions"] = meta.get("jurisdictions", 0) | bit
+                chunk = {"id": doc_id, "text": doc["text"], "meta": meta,
+                         "index_text": _index_text(doc["text"], heading_path)}
+                entries.append((group, doc["type"], doc["path"], chunk))
+        _INDEX.add_shard(code, bit, entries)
+        index_dir = _index_dir()
+        if index_dir is not None:
+            index_dir.mkdir(parents=True, exist_ok=True)
+            registry = {c: jurisdiction.region_keywords(c) for c in _INDEX.shards
+                        if c not in jurisdiction.BUILTIN_REGIONS and c != ShardedIndex.GLOBAL_SHARD}
+            (index_dir / _JURISDICTIONS_FILE).write_text(json.dumps(registry), encoding="utf-8")
+        # Persist now: on restart the shard is only re-created from its snapshot
+        persist_index()
+    logger.info(f"Added {code} search shard with {len(entries)} chunks")
+    return len(entries)
+
+_PERSIST_TIMER: Optional[threading.Timer] = None
+_PERSIST_LOCK = threading.Lock()
+
+def _flush_index_updates() -> None:
+    persist_index()
+    refresh_dense_index()
+
+def _schedule_persist() -> None:
+    """Debounce snapshot writes after ingestion bursts."""
+    global _PERSIST_TIMER
+    with _PERSIST_LOCK:
+        if _PERSIST_TIMER is not None:
+            _PERSIST_TIMER.cancel()
+        _PERSIST_TIMER = threading.Timer(Config.SEARCH_INDEX_PERSIST_DELAY, _flush_index_updates)
+        _PERSIST_TIMER.daemon = True
+        _PERSIST_TIMER.start()
 
 def add_rule_text(text: str) -> None:
-    _FALLBACK_RULES.append(text)
+    _FALLBACK_RULES.add(text)
+    group = "text:" + hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
+    _INDEX.replace_group(group, _tag_chunks(_rule_chunks(text), text), "rule")
+    _schedule_persist()
 
 def add_rule_file(path: str) -> None:
     p = Path(path)
     if not p.exists():
         return
-    try:
-        _FALLBACK_RULES.append(p.read_text(errors="ignore"))
-    except Exception:
-        try:
-            from pypdf import PdfReader
-            txt = "".join((pg.extract_text() or "") for pg in PdfReader(str(p)).pages)
-            _FALLBACK_RULES.append(txt)
-        except Exception:
-            pass
+    txt = _index_file(p, "rule", known_unchanged=False)
+    if txt is None:
+        return
+    _FALLBACK_RULES.add(txt, path=_doc_id(p))
+    _schedule_persist()
 
 def add_contract_file(path: str) -> None:
-    # Pathway pipeline will watch contracts dir; fallback does not use contracts
-    pass
+    # Pathway pipeline watches the contracts dir; the fallback index only
+    # covers the JSON extractions that search used to json.load per query.
+    p = Path(path)
+    if p.suffix.lower() != ".json" or not p.exists():
+        return
+    if _index_file(p, "contract", known_unchanged=False) is not None:
+        _schedule_persist()
+
+def remove_rule_file(path: str) -> bool:
+    """Drop a rule file's text and chunks, e.g. after it was deleted."""
+    group = _doc_id(Path(path))
+    removed = _FALLBACK_RULES.remove_path(group)
+    if _INDEX.remove_group(group):
+        _schedule_persist()
+        removed = True
+    return removed
 
-def get_rules() -> List[str]:
-    return list(_FALLBACK_RULES)
+def get_rules() -> Sequence[str]:
+    """Read-only view of the ingested rule texts (not a copy)."""
+    return _FALLBACK_RULES.view()
 
 # ---------------- Pathway runtime (optional, starts if installed) ------------
 _PIPELINE_STARTED = False
@@ -42,65 +404,59 @@ def start_pipeline() -> None:
         if _PIPELINE_STARTED:
             return
         _PIPELINE_STARTED = True
+        build_index()
         threading.Thread(target=_run_pathway, name="pathway-pipeline", daemon=True).start()
+        pathway_client.start_health_probe()
+
+# ---------------- File watcher (document catalog + change feed) --------------
+# Suffixes the watcher catalogs per document type, and the subset the fallback index covers
+_WATCHED_SUFFIXES = {"rule": (".md", ".pdf"), "contract": (".json", ".pdf")}
+_INDEXED_SUFFIXES = {"rule": (".md", ".pdf"), "contract": (".json",)}
+_WATCHER: Optional[FileWatcher] = None
+_WATCHER_LOCK = threading.Lock()
+
+def get_file_watcher() -> FileWatcher:
+    """The process-wide watcher over the rules and contracts trees, started on first use."""
+    global _WATCHER
+    with _WATCHER_LOCK:
+        if _WATCHER is None:
+            roots = [(_CONTRACTS_DIR, "contract", _WATCHED_SUFFIXES["contract"])]
+            rules_dir = _find_rules_dir()
+            if rules_dir is not None:
+                roots.insert(0, (rules_dir, "rule", _WATCHED_SUFFIXES["rule"]))
+            watcher = FileWatcher(roots, max_events=Config.FILE_WATCHER_MAX_EVENTS,
+                                  poll_interval=Config.FILE_WATCHER_POLL_INTERVAL,
+                                  use_inotify=Config.FILE_WATCHER_USE_INOTIFY)
+            watcher.subscribe(_on_file_event)
+            watcher.start()
+            _WATCHER = watcher
+        return _WATCHER
+
+def _on_file_event(event: dict) -> None:
+    """Keep the search index in step with files changed on disk."""
+    p = Path(event["path"])
+    if not _INDEX_BUILT or p.suffix.lower() not in _INDEXED_SUFFIXES[event["type"]]:
+        return
+    group = _doc_id(p)
+    if event["event"] == "deleted":
+        _FALLBACK_RULES.remove_path(group)
+        changed = _INDEX.remove_group(group)
+    else:
+        text = _index_file(p, event["type"])
+        changed = text is not None
+        # Files ingested via add_rule_file keep their stored text current
+        if changed and _FALLBACK_RULES.has_path(group):
+            _FALLBACK_RULES.add(text, path=group)
+    if changed:
+        _schedule_persist()
 
 def get_live_document_count():
     """Get real-time document count from monitored directories."""
-    import os
-    from pathlib import Path
-    
-    rules_dir = Path("backend/rules")
-    contracts_dir = Path("backend/contracts")
-    
-    count = 0
-    if rules_dir.exists():
-        count += len(list(rules_dir.rglob("*.md")))
-    if contracts_dir.exists():
-        count += len(list(contracts_dir.rglob("*.json")))
-        count += len(list(contracts_dir.rglob("*.pdf")))
-    
-    return count
+    return get_file_watcher().document_count()
 
 def get_recent_changes():
     """Get recently modified files to show live activity."""
-    import os
-    from pathlib import Path
-    import time
-    
-    recent_files = []
-    current_time = time.time()
-    
-    # Check rules directory
-    rules_dir = Path("backend/rules")
-    if rules_dir.exists():
-        for file_path in rules_dir.rglob("*.md"):
-            try:
-                mtime = os.path.getmtime(file_path)
-                if current_time - mtime < 3600:  # Modified in last hour
-                    recent_files.append({
-                        "path": str(file_path),
-                        "modified": mtime,
-                        "type": "rule"
-                    })
-            except:
-                pass
-    
-    # Check contracts directory
-    contracts_dir = Path("backend/contracts")
-    if contracts_dir.exists():
-        for file_path in contracts_dir.rglob("*"):
-            try:
-                mtime = os.path.getmtime(file_path)
-                if current_time - mtime < 3600:  # Modified in last hour
-                    recent_files.append({
-                        "path": str(file_path),
-                        "modified": mtime,
-                        "type": "contract"
-                    })
-            except:
-                pass
-    
-    return sorted(recent_files, key=lambda x: x["modified"], reverse=True)
+    return get_file_watcher().recent_changes(window=3600)
 
 def extract_context_with_highlight(content: str, query_lower: str, query_words: list) -> str:
     """Extract relevant context with highlighted search terms."""
@@ -281,131 +637,234 @@ def _run_pathway():
         print(f"[pathway] not running, using fallback: {e}")
 
 # ---------------- Query helper used by retriever -----------------------------
-def hybrid_search(query: str, top_k: int = 3) -> List[Tuple[str, float]]:
-    """Enhanced document search with semantic matching."""
-    import os
-    import re
-    from pathlib import Path
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    logger.info(f"Searching documents for: {query}")
-    
-    try:
-        # Try Pathway server first
-        import json, urllib.request
-        query_data = {"query": query, "k": top_k}
-        req = urllib.request.Request(
-            "http://127.0.0.1:8765/v1/retrieve",
-            data=json.dumps(query_data).encode(),
-            headers={'Content-Type': 'application/json'}
+_LEG_COUNTS = {"lexical": 0, "pathway": 0, "local_dense": 0}
+_FUSION_POOL = ThreadPoolExecutor(max_workers=Config.SEARCH_FUSION_WORKERS, thread_name_prefix="hybrid-search")
+_QUERY_CACHE = QueryCache(Config.SEARCH_CACHE_SIZE)
+_LEG_LOCK = threading.Lock()
+
+def _count_leg(leg: str, n: int = 1) -> None:
+    with _LEG_LOCK:
+        _LEG_COUNTS[leg] += n
+
+def get_search_stats() -> dict:
+    """How often each search leg served traffic, plus Pathway breaker state."""
+    with _LEG_LOCK:
+        legs = dict(_LEG_COUNTS)
+    return {
+        "served_by": legs,
+        "pathway": pathway_client.get_stats(),
+        "dense": _DENSE.get_stats(),
+        "cache": _QUERY_CACHE.get_stats(),
+        "corpus_version": _INDEX.version,
+        "shards": {name: len(shard) for name, shard in _INDEX.shards.items()},
+        "watcher": get_file_watcher().get_stats(),
+        "pdf_text": get_pdf_text_cache().get_stats(),
+    }
+
+def hybrid_search(query: str, top_k: int = 3, region: Optional[str] = None) -> List[Tuple[str, float]]:
+    """Enhanced document search with semantic matching.
+
+    With region (EU/US/IN/UK), only rules tagged for that jurisdiction at
+    ingestion are ranked.
+    """
+    return hybrid_search_many([query], top_k, region)[0]
+
+def _dense_state() -> tuple:
+    """The dense leg a search would use right now, with the local index version when it is the local one."""
+    if pathway_client.breaker.state == CircuitBreaker.CLOSED:
+        return ("pathway",)
+    if _DENSE.available and len(_DENSE):
+        return ("local_dense", _DENSE.version)
+    return ("none",)
+
+def _search_version() -> tuple:
+    """Query-cache version: the corpus version plus which dense leg is serving.
+
+    Results fused while Pathway was down (or before the dense index was
+    ready) go stale as soon as the better leg is back.
+    """
+    return _INDEX.version, _dense_state()
+
+def _cached_results(queries: List[str], top_k: int,
+                    region: Optional[str]) -> Tuple[tuple, List[Optional[List[Tuple[str, float]]]]]:
+    version = _search_version()
+    return version, [_QUERY_CACHE.get(QueryCache.key(q, top_k, region), version) for q in queries]
+
+def _fuse_and_cache(results, missing: List[int], queries: List[str], top_k: int, region: Optional[str],
+                    version: tuple, lexical: List[List[SearchHit]],
+                    dense: Tuple[List[List[SearchHit]], List[str]]) -> None:
+    dense_hits_by_query, legs = dense
+    for i, lexical_hits, dense_hits, leg in zip(missing, lexical, dense_hits_by_query, legs):
+        results[i] = reciprocal_rank_fusion(
+            [(lexical_hits, Config.SEARCH_LEXICAL_WEIGHT), (dense_hits, Config.SEARCH_DENSE_WEIGHT)],
+            top_k,
         )
-        
-        with urllib.request.urlopen(req, timeout=2.0) as r:
-            data = json.loads(r.read().decode("utf-8"))
-            if isinstance(data, dict) and "results" in data:
-                results = [(it["text"], float(it["score"])) for it in data.get("results", [])]
-                logger.info(f"Pathway returned {len(results)} results")
-                return results
-    except Exception as e:
-        logger.info(f"Pathway server not available, using enhanced search: {e}")
-    
-    # Enhanced fallback search
-    results = []
-    query_lower = query.lower()
-    query_words = [w for w in re.findall(r'\b\w+\b', query_lower) if len(w) > 2]
-    
-    # Search in rules directory - use absolute path for reliability
-    import os
-    current_dir = os.getcwd()
+        # A query Pathway failed mid-search was served by a weaker leg than the version promises
+        if leg == version[1][0]:
+            _QUERY_CACHE.put(QueryCache.key(queries[i], top_k, region), version, results[i])
+
+def fusion_depth(top_k: int) -> int:
+    """Candidates each search leg ranks for top_k; fused rankings only agree between calls at the same depth."""
+    # Each leg ranks deeper than top_k so fusion has overlap to work with
+    return max(top_k * 2, Config.SEARCH_FUSION_DEPTH)
+
+def hybrid_search_many(queries: List[str], top_k: int = 3,
+                       region: Optional[str] = None) -> List[List[Tuple[str, float]]]:
+    """Search a batch of queries in one round: lexical and dense legs in parallel, fused with RRF."""
+    build_index()
+    version, results = _cached_results(queries, top_k, region)
+    missing = [i for i, r in enumerate(results) if r is None]
+    if not missing:
+        return results
+    batch = [queries[i] for i in missing]
+    logger.info(f"Searching documents for {len(batch)} queries: {batch[:3]}")
     
-    # Try to find the backend/rules directory
-    rules_dir = None
-    possible_paths = [
-        Path("backend/rules"),
-        Path("rules"),
-        Path("../../backend/rules"),
-        Path("../../../backend/rules"),
-        Path("/Users/aryakulkarni/Downloads/compliance-copilot/backend/rules")
-    ]
+    depth = fusion_depth(top_k)
+    dense_future = _FUSION_POOL.submit(_dense_leg, batch, depth, region)
+    lexical = _lexical_leg(batch, depth, region)
+    _fuse_and_cache(results, missing, queries, top_k, region, version, lexical, dense_future.result())
+    return results
+
+def _lexical_leg(queries: List[str], depth: int, region: Optional[str]) -> List[List[SearchHit]]:
+    _count_leg("lexical", len(queries))
+    ranked = _INDEX.search_many(queries, depth, region=region)
+    return [_fallback_results(q, hits) for q, hits in zip(queries, ranked)]
+
+def _dense_leg(queries: List[str], depth: int, region: Optional[str]) -> Tuple[List[List[SearchHit]], List[str]]:
+    """Pathway server when it is up (breaker-guarded), otherwise the local dense index."""
+    return _local_dense_fill(queries, pathway_client.retrieve_many(queries, depth), depth, region)
+
+def _local_dense_fill(queries: List[str], results: List[Optional[List[SearchHit]]], depth: int,
+                      region: Optional[str]) -> Tuple[List[List[SearchHit]], List[str]]:
+    """Fill queries Pathway did not answer from the local dense index; also returns the leg that served each."""
+    # Same shard selection as the lexical leg: the region's chunks plus global ones
+    bit = jurisdiction.region_bit(region)
+    if bit is not None:
+        bit |= jurisdiction.GLOBAL
+    legs = []
+    for i, hits in enumerate(results):
+        if hits is not None:
+            legs.append("pathway")
+            if bit is not None:
+                # Pathway results carry no tags; classify the (few) returned texts
+                results[i] = [h for h in hits if _pathway_hit_mask(h) & bit]
+        elif _DENSE.available and len(_DENSE):
+            legs.append("local_dense")
+            results[i] = _fallback_results(queries[i], _DENSE.search(queries[i], depth, tag_mask=bit))
+        else:
+            legs.append("none")
+            results[i] = []
+        if legs[-1] != "none":
+            _count_leg(legs[-1])
+    return results, legs
+
+def _pathway_hit_mask(hit: SearchHit) -> int:
+    """Jurisdictions of a Pathway hit, narrowed from its file's tags when the file is indexed here."""
+    mask = jurisdiction.classify(hit[0])
+    source = getattr(hit, "source", None)
+    file_mask = _INDEX.group_mask(_doc_id(Path(source))) if source else 0
+    return jurisdiction.narrow(file_mask, mask) if file_mask else mask
+
+def _lexical_cost(queries: List[str]) -> int:
+    """Rough CPU cost of a lexical pass: query terms times documents that may be scored."""
+    return sum(len(set(tokenize(q))) for q in queries) * len(_INDEX)
+
+async def async_hybrid_search(query: str, top_k: int = 3, region: Optional[str] = None) -> List[Tuple[str, float]]:
+    """asyncio variant of hybrid_search for async request handlers."""
+    return (await async_hybrid_search_many([query], top_k, region))[0]
+
+async def async_hybrid_search_many(queries: List[str], top_k: int = 3,
+                                   region: Optional[str] = None) -> List[List[Tuple[str, float]]]:
+    """Same results as hybrid_search_many without blocking the event loop.
+
+    Pathway is queried over async HTTP; the index build, local embedding and
+    any lexical pass above SEARCH_INLINE_CPU_BUDGET run on the bounded
+    search executor, while small lexical passes stay inline.
+    """
+    loop = asyncio.get_running_loop()
+    if not _INDEX_BUILT:
+        await loop.run_in_executor(_FUSION_POOL, build_index)
+    version, results = _cached_results(queries, top_k, region)
+    missing = [i for i, r in enumerate(results) if r is None]
+    if not missing:
+        return results
+    batch = [queries[i] for i in missing]
+    logger.info(f"Searching documents for {len(batch)} queries: {batch[:3]}")
     
-    for path in possible_paths:
-        if path.exists():
-            rules_dir = path
-            break
+    depth = fusion_depth(top_k)
+    async def dense_leg() -> Tuple[List[List[SearchHit]], List[str]]:
+        remote = await pathway_client.async_retrieve_many(batch, depth)
+        if all(hits is not None for hits in remote):
+            return _local_dense_fill(batch, remote, depth, region)
+        return await loop.run_in_executor(_FUSION_POOL, _local_dense_fill, batch, remote, depth, region)
     
-    if rules_dir:
-        logger.info(f"Searching in rules directory: {rules_dir}")
-        file_count = 0
-        for file_path in rules_dir.rglob("*.md"):
-            file_count += 1
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Calculate relevance score
-                    score = 0
-                    content_lower = content.lower()
-                    
-                    # Exact phrase match (highest score)
-                    if query_lower in content_lower:
-                        score += 10
-                    
-                    # Word matches
-                    for word in query_words:
-                        word_count = content_lower.count(word)
-                        score += word_count * 2
-                    
-                    # Semantic keyword matching
-                    semantic_keywords = {
-                        'gdpr': ['privacy', 'data', 'protection', 'consent', 'personal'],
-                        'privacy': ['data', 'personal', 'consent', 'protection', 'gdpr'],
-                        'labor': ['employment', 'worker', 'employee', 'workplace', 'termination'],
-                        'tax': ['withholding', 'revenue', 'financial', 'payment', 'income'],
-                        'confidentiality': ['secret', 'proprietary', 'non-disclosure', 'private'],
-                        'termination': ['end', 'conclude', 'finish', 'notice', 'period']
-                    }
-                    
-                    for query_word in query_words:
-                        if query_word in semantic_keywords:
-                            for semantic_word in semantic_keywords[query_word]:
-                                score += content_lower.count(semantic_word) * 0.5
-                    
-                    if score > 0:
-                        # Extract relevant snippet with context
-                        snippet = extract_context_with_highlight(content, query_lower, query_words)
-                        results.append((snippet, float(score)))
-            except Exception as e:
-                logger.warning(f"Error reading {file_path}: {e}")
-        
-        logger.info(f"Processed {file_count} files, found {len(results)} matches")
+    dense_task = asyncio.ensure_future(dense_leg())
+    if _lexical_cost(batch) <= Config.SEARCH_INLINE_CPU_BUDGET:
+        lexical = _lexical_leg(batch, depth, region)
     else:
-        logger.warning("No rules directory found")
-    
-    # Search in contracts directory
-    contracts_dir = Path("backend/contracts")
-    if contracts_dir.exists():
-        for file_path in contracts_dir.rglob("*.json"):
-            try:
-                import json
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    content = str(data)
-                    content_lower = content.lower()
-                    
-                    score = 0
-                    if query_lower in content_lower:
-                        score += 10
-                    
-                    for word in query_words:
-                        score += content_lower.count(word) * 2
-                    
-                    if score > 0:
-                        snippet = extract_context_with_highlight(content, query_lower, query_words)
-                        results.append((snippet, float(score)))
-            except Exception as e:
-                logger.warning(f"Error reading {file_path}: {e}")
-    
-    # Sort by score and return top results
-    results.sort(key=lambda x: x[1], reverse=True)
-    logger.info(f"Enhanced search returned {len(results[:top_k])} results")
-    return results[:top_k]
\ No newline at end of file
+        lexical = await loop.run_in_executor(_FUSION_POOL, _lexical_leg, batch, depth, region)
+    _fuse_and_cache(results, missing, queries, top_k, region, version, lexical, await dense_task)
+    return results
+
+def reciprocal_rank_fusion(ranked_lists: List[Tuple[List[SearchHit], float]], top_k: int,
+                           k: int = Config.SEARCH_RRF_K) -> List[SearchHit]:
+    """Merge ranked hit lists: score = sum(weight / (k + rank)), deduplicated by chunk id.
+
+    Hits without a chunk id (Pathway results) are keyed by source and text.
+    The first list's hit object is kept for display when a chunk appears twice.
+    """
+    fused: Dict[str, float] = {}
+    representative: Dict[str, SearchHit] = {}
+    for hits, weight in ranked_lists:
+        if not weight:
+            continue
+        for rank, hit in enumerate(hits, start=1):
+            key = getattr(hit, "chunk_id", None) or f"{getattr(hit, 'source', None)}|{hit[0][:200]}"
+            fused[key] = fused.get(key, 0.0) + weight / (k + rank)
+            representative.setdefault(key, hit)
+    ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:top_k]
+    out = []
+    for key, score in ranked:
+        hit = representative[key]
+        out.append(SearchHit(hit[0], score, source=getattr(hit, "source", None),
+                             section=getattr(hit, "section", None), chunk_id=getattr(hit, "chunk_id", None)))
+    return out
+
+def semantic_search(query: str, top_k: int = 3) -> List[SearchHit]:
+    """Embedding search over the local dense index (empty if it is unavailable)."""
+    build_index()
+    return _fallback_results(query, _DENSE.search(query, top_k))
+
+_SNIPPET_CHARS = 800
+
+def _fallback_results(query: str, hits: List[Tuple[str, float]]) -> List[SearchHit]:
+    """Turn ranked chunk ids into hits; the snippet is the section itself, not a rescan."""
+    query_lower = query.lower()
+    query_words = tokenize(query)
+    results = []
+    for doc_id, score in hits:
+        doc = _INDEX.get_document(doc_id)
+        if doc is None:
+            continue
+        section_text = doc["text"]
+        if len(section_text) > _SNIPPET_CHARS:
+            section_text = section_text[:_SNIPPET_CHARS] + "..."
+        heading_path = doc["meta"].get("heading_path") or []
+        parents = breadcrumb(heading_path)
+        if parents:
+            section_text = f"{parents}\n{section_text}"
+        if heading_path:
+            section = heading_path[-1]
+        elif doc["meta"].get("page"):
+            section = f"page {doc['meta']['page']}"
+        else:
+            section = None
+        snippet = highlight_search_terms(section_text, query_lower, query_words)
+        results.append(SearchHit(
+            snippet,
+            float(score),
+            source=doc["path"],
+            section=section,
+            chunk_id=doc_id,
+        ))
+    return results
@@ -0,0 +1,164 @@
+"""
+Cached page-level text extraction for PDF rules and contracts
+Text is extracted once per distinct file content (SHA-256) and stored on disk
+as one JSON document of per-page strings; large PDFs are split into page
+ranges extracted in parallel on a process pool, each worker opening the file
+by path rather than receiving a pickled copy of its bytes
+"""
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages, extraction runs in-process; pool start-up would dominate
+_PARALLEL_MIN_PAGES = 16
+
+
+def _extract_range(source: Union[str, bytes], start: int, end: int) -> List[str]:
+    """Extract pages [start, end) of a PDF (a path or its bytes); runs in pool workers, so module-level."""
+    from pypdf import PdfReader
+    reader = PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+    return [(reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+def _file_digest(path: Path) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _page_count(data: bytes) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+class PdfTextCache:
+    """Content-hash keyed cache of per-page PDF text, in memory and on disk"""
+
+    def __init__(self, directory: Optional[Path] = None, max_workers: int = 4, memory_entries: int = 32):
+        self.directory = Path(directory) if directory else None
+        self.max_workers = max(1, max_workers)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "extractions": 0, "pages_extracted": 0}
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: the server process runs threads, which fork() does not mix well with
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _remember(self, digest: str, pages: List[str]) -> None:
+        with self._lock:
+            self._memory[digest] = pages
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _cache_file(self, digest: str) -> Optional[Path]:
+        return self.directory / f"{digest}.json" if self.directory else None
+
+    def _load(self, digest: str) -> Optional[List[str]]:
+        with self._lock:
+            pages = self._memory.get(digest)
+            if pages is not None:
+                self._memory.move_to_end(digest)
+                self._stats["memory_hits"] += 1
+                return pages
+        cache_file = self._cache_file(digest)
+        if cache_file is None or not cache_file.exists():
+            return None
+        try:
+            pages = json.loads(cache_file.read_bytes())["pages"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable PDF text cache entry {cache_file}: {e}")
+            return None
+        self._count("disk_hits")
+        self._remember(digest, pages)
+        return pages
+
+    def _store(self, digest: str, pages: List[str]) -> None:
+        self._remember(digest, pages)
+        cache_file = self._cache_file(digest)
+        if cache_file is None:
+            return
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_name(f".{digest}-{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"pages": pages}), encoding="utf-8")
+            os.replace(tmp, cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to write PDF text cache entry: {e}")
+
+    def _extract(self, path: Path, data: bytes, digest: str) -> List[str]:
+        n_pages = _page_count(data)
+        if n_pages < _PARALLEL_MIN_PAGES or self.max_workers == 1:
+            return _extract_range(data, 0, n_pages)
+        step = -(-n_pages // self.max_workers)
+        ranges = [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+        try:
+            futures = [self._get_pool().submit(_extract_range, str(path), start, end) for start, end in ranges]
+            pages = [page for future in futures for page in future.result()]
+            # Workers read the file themselves; make sure it is still the content we hashed
+            if _file_digest(path) == digest:
+                return pages
+            logger.info(f"{path} changed during parallel extraction, extracting serially")
+        except Exception as e:
+            logger.warning(f"Parallel PDF extraction failed, extracting serially: {e}")
+        return _extract_range(data, 0, n_pages)
+
+    def pages(self, path: Path, data: Optional[bytes] = None, digest: Optional[str] = None) -> List[str]:
+        """Per-page text of the PDF at path (data/digest may be passed if already read).
+
+        Returns [] if the file cannot be read or parsed.
+        """
+        if data is None:
+            try:
+                data = Path(path).read_bytes()
+            except OSError:
+                return []
+        digest = digest or hashlib.sha256(data).hexdigest()
+        pages = self._load(digest)
+        if pages is not None:
+            return pages
+        try:
+            pages = self._extract(Path(path), data, digest)
+        except Exception as e:
+            logger.warning(f"PDF text extraction failed for {path}: {e}")
+            return []
+        self._count("extractions")
+        self._count("pages_extracted", len(pages))
+        self._store(digest, pages)
+        return pages
+
+    def text(self, path: Path, data: Optional[bytes] = None, digest: Optional[str] = None) -> str:
+        return "\n".join(self.pages(path, data, digest))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        return stats
@@ -3,11 +3,13 @@ Risk Correlation Engine
 Analyzes cross-document risk patterns and hidden connections
 This is a novel feature that goes beyond basic compliance checking
 """
+import hashlib
 import logging
-from typing import List, Dict, Any, Tuple, Optional
-from datetime import datetime
-from models.schemas import ContractField, ComplianceFlag, Evidence
-from pathway_pipeline import hybrid_search
+from typing import List, Dict, Any, Optional
+from models.schemas import ContractField
+from analysis_context import AnalysisContext
+from query_cache import QueryCache
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +39,38 @@ class RiskCorrelationEngine:
                 "risk_indicators": ["unlimited", "uncapped", "excessive", "penalty"]
             }
         }
+        # Correlations are a pure function of (fields, region): cache them by fingerprint
+        self._results = QueryCache(Config.RISK_CORRELATION_CACHE_SIZE)
     
-    def analyze_cross_document_risks(self, fields: List[ContractField], region: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def fingerprint(fields: List[ContractField], region: str) -> str:
+        """Stable digest of region plus each field's name, value and evidence."""
+        digest = hashlib.sha256(region.upper().encode())
+        for f in fields:
+            ev = f.evidence
+            for part in (f.name, str(f.value), ev.file, str(ev.page), str(ev.section)):
+                digest.update(b"\x1f" + part.encode("utf-8", errors="ignore"))
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._results.get_stats()
+    
+    def analyze_cross_document_risks(self, fields: List[ContractField], region: str,
+                                     context: Optional[AnalysisContext] = None) -> List[Dict[str, Any]]:
         """
         Analyze risks across multiple documents to find hidden correlations
+        Results for an unchanged field list are served from cache; treat them as read-only
         """
+        key = self.fingerprint(fields, region)
+        if context is not None:
+            return context.memoize(("risk_correlations", key), lambda: self._correlations(fields, region, key))
+        return self._correlations(fields, region, key)
+    
+    def _correlations(self, fields: List[ContractField], region: str, key: str) -> List[Dict[str, Any]]:
+        cached = self._results.get(key, 0)
+        if cached is not None:
+            return cached
         logger.info(f"Analyzing cross-document risks for region: {region}")
         
         correlations = []
@@ -61,6 +90,7 @@ class RiskCorrelationEngine:
         correlations.extend(jurisdiction_conflicts)
         
         logger.info(f"Found {len(correlations)} risk correlations")
+        self._results.put(key, 0, correlations)
         return correlations
     
     def _analyze_rule_correlation(self, fields: List[ContractField], rule_name: str, 
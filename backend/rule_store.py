@@ -0,0 +1,107 @@
+"""
+Content-addressed store for ingested rule texts
+Rules are keyed by the SHA-256 of their normalized text, so identical rules
+are stored once, and each source path maps to the hash of its latest
+version, so re-saving a file replaces what it held before
+"""
+import hashlib
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+
+def normalize_rule_text(text: str) -> str:
+    """Line endings unified, trailing whitespace and surrounding blank lines dropped."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def rule_hash(text: str) -> str:
+    return hashlib.sha256(normalize_rule_text(text).encode("utf-8", errors="ignore")).hexdigest()
+
+
+class RuleStore:
+    """Deduplicated rule texts with path -> content-hash tracking"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts: Dict[str, str] = {}
+        # Every rule is referenced by at least one path or by being added as loose text
+        self._refs: Dict[str, Set[str]] = {}
+        self._paths: Dict[str, str] = {}
+        self._view: Optional[Tuple[str, ...]] = ()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, text: str) -> bool:
+        return rule_hash(text) in self._texts
+
+    def _ref(self, digest: str, text: str, ref: str) -> None:
+        if digest not in self._texts:
+            self._texts[digest] = text
+            self._view = None
+        self._refs.setdefault(digest, set()).add(ref)
+
+    def _unref(self, digest: str, ref: str) -> None:
+        refs = self._refs.get(digest)
+        if refs is None:
+            return
+        refs.discard(ref)
+        if not refs:
+            del self._refs[digest]
+            del self._texts[digest]
+            self._view = None
+
+    def add(self, text: str, path: Optional[str] = None) -> str:
+        """Store text (once per distinct content) and return its hash.
+
+        With a path, the path's previous version is released.
+        """
+        digest = rule_hash(text)
+        with self._lock:
+            if path is None:
+                self._ref(digest, text, "text:" + digest)
+                return digest
+            previous = self._paths.get(path)
+            if previous == digest:
+                return digest
+            self._ref(digest, text, path)
+            self._paths[path] = digest
+            if previous is not None:
+                self._unref(previous, path)
+        return digest
+
+    def remove_path(self, path: str) -> bool:
+        with self._lock:
+            digest = self._paths.pop(path, None)
+            if digest is None:
+                return False
+            self._unref(digest, path)
+            return True
+
+    def remove(self, digest: str) -> bool:
+        """Drop a rule regardless of which paths reference it."""
+        with self._lock:
+            if digest not in self._texts:
+                return False
+            for ref in self._refs.pop(digest, set()):
+                self._paths.pop(ref, None)
+            del self._texts[digest]
+            self._view = None
+            return True
+
+    def has_path(self, path: str) -> bool:
+        return path in self._paths
+
+    def get(self, digest: str) -> Optional[str]:
+        return self._texts.get(digest)
+
+    def view(self) -> Tuple[str, ...]:
+        """Immutable snapshot of all rules; rebuilt only after the store changes."""
+        view = self._view
+        if view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = tuple(self._texts.values())
+                view = self._view
+        return view
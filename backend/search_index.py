@@ -0,0 +1,601 @@
+"""
+In-memory inverted index for the hybrid_search fallback path
+Keeps term -> postings (with per-field term frequencies) and per-document
+field lengths so a query only touches the postings of its own terms, and
+ranks candidates with BM25F over the precomputed term statistics
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\b\w+\b")
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.*)$")
+
+# Indexed fields; postings store one term frequency per field in this order
+FIELDS = ("heading", "body")
+
+# Query expansion used by the fallback scorer (built once, not per file)
+SEMANTIC_KEYWORDS = {
+    'gdpr': ['privacy', 'data', 'protection', 'consent', 'personal'],
+    'privacy': ['data', 'personal', 'consent', 'protection', 'gdpr'],
+    'labor': ['employment', 'worker', 'employee', 'workplace', 'termination'],
+    'tax': ['withholding', 'revenue', 'financial', 'payment', 'income'],
+    'confidentiality': ['secret', 'proprietary', 'non-disclosure', 'private'],
+    'termination': ['end', 'conclude', 'finish', 'notice', 'period']
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens longer than two characters (same rule as query words)."""
+    return [w for w in _TOKEN_RE.findall(text.lower()) if len(w) > 2]
+
+
+def split_fields(text: str) -> Tuple[str, str]:
+    """Split markdown into (heading text, body text)."""
+    headings, body = [], []
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            headings.append(match.group(1))
+        else:
+            body.append(line)
+    return "\n".join(headings), "\n".join(body)
+
+
+class BM25Scorer:
+    """BM25F: per-field length normalisation and boosts folded into one saturated tf"""
+
+    def __init__(self, k1: float = 1.2, field_weights: Optional[Dict[str, float]] = None,
+                 field_b: Optional[Dict[str, float]] = None, expansion_weight: float = 0.3):
+        self.k1 = k1
+        self.field_weights = field_weights or {"heading": 3.0, "body": 1.0}
+        self.field_b = field_b or {"heading": 0.3, "body": 0.75}
+        self.expansion_weight = expansion_weight
+
+    def idf(self, df: int, n_docs: int) -> float:
+        return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _weighted_terms(self, query_terms: List[str]) -> Dict[str, float]:
+        weighted_terms: Dict[str, float] = {}
+        for term in query_terms:
+            weighted_terms[term] = max(weighted_terms.get(term, 0.0), 1.0)
+            for semantic_word in SEMANTIC_KEYWORDS.get(term, []):
+                weighted_terms.setdefault(semantic_word, self.expansion_weight)
+        return weighted_terms
+
+    def score(self, index: "InvertedIndex", query_terms: List[str]) -> Dict[str, float]:
+        """Score every document in the postings of query_terms (plus expansions)."""
+        return self.score_many(index, [query_terms])[0]
+
+    def score_many(self, index: "InvertedIndex", queries_terms: List[List[str]]) -> List[Dict[str, float]]:
+        """Score a batch of queries, looking up each distinct term's postings once."""
+        n_docs = len(index)
+        if not n_docs:
+            return [{} for _ in queries_terms]
+        avg_lengths = index.avg_field_lengths()
+
+        batch_terms = [self._weighted_terms(terms) for terms in queries_terms]
+        # Per-term contribution (idf * saturated tf) per document, shared across queries
+        contributions: Dict[str, Dict[str, float]] = {}
+        lengths_cache: Dict[str, Tuple[int, ...]] = {}
+        for term in set().union(*batch_terms):
+            postings = index.postings(term)
+            if not postings:
+                continue
+            idf = self.idf(len(postings), n_docs)
+            per_doc = {}
+            for doc_id, field_tfs in postings.items():
+                lengths = lengths_cache.get(doc_id)
+                if lengths is None:
+                    lengths = lengths_cache[doc_id] = index.field_lengths(doc_id)
+                tf = 0.0
+                for i, field in enumerate(FIELDS):
+                    if not field_tfs[i]:
+                        continue
+                    b = self.field_b[field]
+                    avg = avg_lengths[i] or 1.0
+                    tf += self.field_weights[field] * field_tfs[i] / (1.0 - b + b * lengths[i] / avg)
+                per_doc[doc_id] = idf * tf / (self.k1 + tf)
+            contributions[term] = per_doc
+
+        results = []
+        for weighted_terms in batch_terms:
+            scores: Dict[str, float] = {}
+            for term, query_weight in weighted_terms.items():
+                for doc_id, contribution in contributions.get(term, {}).items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + query_weight * contribution
+            results.append(scores)
+        return results
+
+
+class SearchHit(tuple):
+    """(text, score) result that also carries where the text came from.
+
+    Unpacks like the plain tuples hybrid_search has always returned.
+    """
+
+    def __new__(cls, text: str, score: float, source: Optional[str] = None,
+                section: Optional[str] = None, chunk_id: Optional[str] = None):
+        hit = super().__new__(cls, (text, score))
+        hit.source = source
+        hit.section = section
+        hit.chunk_id = chunk_id
+        return hit
+
+    @property
+    def text(self) -> str:
+        return self[0]
+
+    @property
+    def score(self) -> float:
+        return self[1]
+
+    def __getnewargs__(self):
+        return (self[0], self[1], self.source, self.section, self.chunk_id)
+
+
+class InvertedIndex:
+    """Thread-safe resident index of rule and contract chunks
+
+    Documents (chunks) live either in an optional memory-mapped base
+    snapshot (see index_store) or in the in-memory delta; re-indexing or
+    removing a base document hides its base postings behind a tombstone.
+    Chunks cut from the same file share a group, and the group carries the
+    file fingerprint used to skip unchanged files on restart.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        self._field_lengths: Dict[str, Tuple[int, ...]] = {}
+        self._field_length_totals = [0] * len(FIELDS)
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._groups: Dict[str, List[str]] = {}
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._base = None
+        self._base_deleted: Set[str] = set()
+        self.scorer = BM25Scorer()
+        self.dirty = False
+        # Monotonic corpus version, bumped on every add/edit/removal
+        self.version = 0
+
+    def attach_base(self, segment, bump_version: bool = True) -> None:
+        """Replace the whole index with a mapped snapshot (drops the in-memory delta).
+
+        Pass bump_version=False when the snapshot was just written from this
+        index, i.e. the searchable corpus did not change.
+        """
+        with self.lock:
+            self._postings = {}
+            self._field_lengths = {}
+            self._docs = {}
+            self._groups = {}
+            self._sources = dict(segment.sources) if segment else {}
+            self._base = segment
+            self._base_deleted = set()
+            if segment:
+                for doc in segment.docs:
+                    self._groups.setdefault(doc["group"], []).append(doc["id"])
+            self._field_length_totals = list(segment.field_length_totals) if segment else [0] * len(FIELDS)
+            self.dirty = False
+            if bump_version:
+                self.version += 1
+
+    def _in_base(self, doc_id: str) -> bool:
+        return (self._base is not None and doc_id in self._base.ordinals
+                and doc_id not in self._base_deleted)
+
+    def __len__(self) -> int:
+        base_count = len(self._base) - len(self._base_deleted) if self._base is not None else 0
+        return len(self._docs) + base_count
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs or self._in_base(doc_id)
+
+    def doc_ids(self) -> List[str]:
+        with self.lock:
+            ids = list(self._docs)
+            if self._base is not None:
+                ids.extend(d for d in self._base.doc_ids if d not in self._base_deleted and d not in self._docs)
+            return ids
+
+    def groups(self) -> List[str]:
+        with self.lock:
+            return list(self._groups)
+
+    def has_group(self, group: str) -> bool:
+        return group in self._groups
+
+    def terms(self) -> Set[str]:
+        with self.lock:
+            terms = set(self._postings)
+            if self._base is not None:
+                terms.update(self._base.terms())
+            return terms
+
+    def add_document(self, doc_id: str, text: str, doc_type: str = "rule", path: Optional[str] = None,
+                     group: Optional[str] = None, meta: Optional[Dict[str, Any]] = None,
+                     index_text: Optional[str] = None) -> None:
+        """Index (or re-index) a single document/chunk under doc_id.
+
+        index_text, when given, is tokenized instead of text (e.g. a chunk
+        with its parent headings prepended); text is what search returns.
+        """
+        field_counts = [Counter(tokenize(part)) for part in split_fields(index_text or text)]
+        terms = set().union(*field_counts)
+        lengths = tuple(sum(c.values()) for c in field_counts)
+        group = group or doc_id
+        with self.lock:
+            self._remove_locked(doc_id)
+            self._docs[doc_id] = {
+                "text": text,
+                "type": doc_type,
+                "path": path or doc_id,
+                "group": group,
+                "meta": meta or {},
+                "terms": terms,
+            }
+            self._groups.setdefault(group, []).append(doc_id)
+            self._field_lengths[doc_id] = lengths
+            for i, length in enumerate(lengths):
+                self._field_length_totals[i] += length
+            for term in terms:
+                self._postings.setdefault(term, {})[doc_id] = tuple(c[term] for c in field_counts)
+            self.dirty = True
+            self.version += 1
+
+    def replace_group(self, group: str, chunks: List[Dict[str, Any]], doc_type: str = "rule",
+                      path: Optional[str] = None, source: Optional[Dict[str, Any]] = None) -> None:
+        """Atomically swap every chunk of group (e.g. one rule file) for chunks.
+
+        Each chunk dict has "text" plus optional "index_text", "meta" and
+        "id"; chunk ids default to "<group>#<n>". source is the file fingerprint.
+        """
+        with self.lock:
+            self.remove_group(group)
+            for n, chunk in enumerate(chunks):
+                self.add_document(chunk.get("id") or f"{group}#{n}", chunk["text"], doc_type, path, group=group,
+                                  meta=chunk.get("meta"), index_text=chunk.get("index_text"))
+            if source is not None:
+                self._sources[group] = source
+            self.dirty = True
+
+    def remove_group(self, group: str) -> bool:
+        with self.lock:
+            doc_ids = self._groups.pop(group, [])
+            for doc_id in list(doc_ids):
+                self._remove_locked(doc_id, keep_group=True)
+            had_source = self._sources.pop(group, None) is not None
+            if doc_ids or had_source:
+                self.dirty = True
+                self.version += 1
+            return bool(doc_ids)
+
+    def remove_document(self, doc_id: str) -> bool:
+        with self.lock:
+            removed = self._remove_locked(doc_id)
+            if removed:
+                self.dirty = True
+                self.version += 1
+            return removed
+
+    def _remove_locked(self, doc_id: str, keep_group: bool = False) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            if not self._in_base(doc_id):
+                return False
+            self._base_deleted.add(doc_id)
+            base_doc = self._base.docs[self._base.ordinals[doc_id]]
+            for i, length in enumerate(base_doc["field_lengths"]):
+                self._field_length_totals[i] -= length
+            if not keep_group:
+                self._unlink_group(base_doc["group"], doc_id)
+            return True
+        lengths = self._field_lengths.pop(doc_id, ())
+        for i, length in enumerate(lengths):
+            self._field_length_totals[i] -= length
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        if not keep_group:
+            self._unlink_group(doc["group"], doc_id)
+        return True
+
+    def _unlink_group(self, group: str, doc_id: str) -> None:
+        members = self._groups.get(group)
+        if members is None:
+            return
+        if doc_id in members:
+            members.remove(doc_id)
+        if not members:
+            del self._groups[group]
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._docs.get(doc_id)
+        if doc is not None or not self._in_base(doc_id):
+            return doc
+        ordinal = self._base.ordinals[doc_id]
+        meta = self._base.docs[ordinal]
+        return {
+            "text": self._base.text(ordinal),
+            "type": meta["type"],
+            "path": meta["path"],
+            "group": meta["group"],
+            "meta": meta.get("meta") or {},
+        }
+
+    def get_source(self, group: str) -> Optional[Dict[str, Any]]:
+        """File fingerprint (mtime, size, sha256) recorded for group."""
+        return self._sources.get(group)
+
+    def set_source(self, group: str, source: Dict[str, Any]) -> None:
+        """Refresh a fingerprint (e.g. touched but unchanged file) without re-indexing."""
+        with self.lock:
+            if group in self._groups:
+                self._sources[group] = source
+                self.dirty = True
+
+    def sources(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return dict(self._sources)
+
+    def postings(self, term: str) -> Dict[str, Tuple[int, ...]]:
+        memory = self._postings.get(term)
+        if self._base is None:
+            return memory or {}
+        merged = {}
+        doc_ids = self._base.doc_ids
+        for ordinal, tfs in self._base.postings(term):
+            doc_id = doc_ids[ordinal]
+            if doc_id not in self._base_deleted:
+                merged[doc_id] = tfs
+        if memory:
+            merged.update(memory)
+        return merged
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings(term))
+
+    def field_lengths(self, doc_id: str) -> Tuple[int, ...]:
+        lengths = self._field_lengths.get(doc_id)
+        if lengths is not None:
+            return lengths
+        if self._in_base(doc_id):
+            return tuple(self._base.docs[self._base.ordinals[doc_id]]["field_lengths"])
+        return (0,) * len(FIELDS)
+
+    def avg_field_lengths(self) -> List[float]:
+        n_docs = len(self) or 1
+        return [total / n_docs for total in self._field_length_totals]
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """BM25F-rank documents reachable from the query's postings; returns (doc_id, score)."""
+        return self.search_many([query], top_k)[0]
+
+    def search_many(self, queries: List[str], top_k: int = 3) -> List[List[Tuple[str, float]]]:
+        """Rank a batch of queries in one pass over the postings of their combined terms."""
+        with self.lock:
+            batch_scores = self.scorer.score_many(self, [tokenize(q) for q in queries])
+        return [heapq.nlargest(top_k, scores.items(), key=lambda x: x[1]) for scores in batch_scores]
+
+
+class _ShardUnion:
+    """Read-only view over several shards with combined BM25 statistics
+
+    n_docs and field_length_totals count each chunk once, however many of
+    the shards hold it (see ShardedIndex._union_stats).
+    """
+
+    def __init__(self, shards: List[InvertedIndex], n_docs: int, field_length_totals: List[int]):
+        self.shards = shards
+        self.n_docs = n_docs
+        self.field_length_totals = field_length_totals
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def avg_field_lengths(self) -> List[float]:
+        n_docs = self.n_docs or 1
+        return [total / n_docs for total in self.field_length_totals]
+
+    def postings(self, term: str) -> Dict[str, Tuple[int, ...]]:
+        if len(self.shards) == 1:
+            return self.shards[0].postings(term)
+        merged: Dict[str, Tuple[int, ...]] = {}
+        for shard in self.shards:
+            merged.update(shard.postings(term))
+        return merged
+
+    def field_lengths(self, doc_id: str) -> Tuple[int, ...]:
+        for shard in self.shards:
+            if doc_id in shard:
+                return shard.field_lengths(doc_id)
+        return (0,) * len(FIELDS)
+
+
+class ShardedIndex:
+    """Search index partitioned into per-jurisdiction shards plus a global shard
+
+    shard_bits maps shard name -> jurisdiction bit; a chunk is placed in
+    every shard whose bit is set in its meta["jurisdictions"] mask (so a
+    chunk that applies to EU and UK lives in both). Region searches only
+    touch {region shard, global shard}, scored with their combined
+    statistics. Mirrors the InvertedIndex API used by the pipeline.
+    """
+
+    GLOBAL_SHARD = "global"
+
+    def __init__(self, shard_bits: Dict[str, int]):
+        self.lock = threading.RLock()
+        self.shard_bits: Dict[str, int] = dict(shard_bits)
+        self.shards: Dict[str, InvertedIndex] = {name: InvertedIndex() for name in self.shard_bits}
+        # Bumped by shard-set changes; shard versions cover document changes
+        self._layout_version = 0
+        # shard names -> (shard versions, distinct chunks, field-length totals)
+        self._union_stats_cache: Dict[Tuple[str, ...], Tuple[Tuple[int, ...], int, List[int]]] = {}
+
+    def add_shard(self, name: str, bit: int, chunks: Optional[List[Dict[str, Any]]] = None) -> InvertedIndex:
+        """Register a new jurisdiction shard; existing shards are not touched.
+
+        chunks are (group, doc_type, path, chunk) entries to seed the shard with.
+        """
+        with self.lock:
+            if name in self.shards:
+                raise ValueError(f"shard {name!r} already exists")
+            shard = InvertedIndex()
+            by_group: Dict[str, List[Any]] = {}
+            for group, doc_type, path, chunk in chunks or []:
+                by_group.setdefault(group, [doc_type, path, []])[2].append(chunk)
+            for group, (doc_type, path, group_chunks) in by_group.items():
+                shard.replace_group(group, group_chunks, doc_type, path, source=self.get_source(group))
+            self.shard_bits[name] = bit
+            self.shards[name] = shard
+            self._layout_version += 1
+            return shard
+
+    def shards_for(self, region: Optional[str]) -> List[InvertedIndex]:
+        """The region shard plus the global shard, or every shard for unknown regions."""
+        return [self.shards[name] for name in self._shard_names_for(region)]
+
+    def _shard_names_for(self, region: Optional[str]) -> List[str]:
+        name = region.upper() if region else None
+        if name not in self.shards or name == self.GLOBAL_SHARD:
+            return list(self.shards)
+        return [name, self.GLOBAL_SHARD]
+
+    def _union_stats(self, names: List[str]) -> Tuple[int, List[int]]:
+        """Distinct chunk count and field-length totals over the named shards.
+
+        A multi-jurisdiction chunk is placed in several shards but must count
+        once for BM25 IDF and length normalisation. Recomputed only when one
+        of the shards changed. The caller holds self.lock.
+        """
+        key = tuple(names)
+        versions = tuple(self.shards[name].version for name in names)
+        cached = self._union_stats_cache.get(key)
+        if cached is not None and cached[0] == versions:
+            return cached[1], cached[2]
+        n_docs, totals = 0, [0] * len(FIELDS)
+        seen: Set[str] = set()
+        for name in names:
+            shard = self.shards[name]
+            n_docs += len(shard)
+            totals = [t + s for t, s in zip(totals, shard._field_length_totals)]
+            if len(names) == 1:
+                break
+            for doc_id in shard.doc_ids():
+                if doc_id in seen:
+                    n_docs -= 1
+                    totals = [t - l for t, l in zip(totals, shard.field_lengths(doc_id))]
+                else:
+                    seen.add(doc_id)
+        self._union_stats_cache[key] = (versions, n_docs, totals)
+        return n_docs, totals
+
+    @property
+    def version(self) -> int:
+        return self._layout_version + sum(shard.version for shard in self.shards.values())
+
+    @property
+    def dirty(self) -> bool:
+        return any(shard.dirty for shard in self.shards.values())
+
+    def __len__(self) -> int:
+        """Distinct chunks across shards (a multi-jurisdiction chunk counts once)."""
+        with self.lock:
+            return self._union_stats(list(self.shards))[0]
+
+    def __contains__(self, doc_id: str) -> bool:
+        return any(doc_id in shard for shard in self.shards.values())
+
+    def doc_ids(self) -> List[str]:
+        with self.lock:
+            seen: Dict[str, None] = {}
+            for shard in self.shards.values():
+                seen.update(dict.fromkeys(shard.doc_ids()))
+            return list(seen)
+
+    def groups(self) -> List[str]:
+        with self.lock:
+            return list({g: None for shard in self.shards.values() for g in shard.groups()})
+
+    def replace_group(self, group: str, chunks: List[Dict[str, Any]], doc_type: str = "rule",
+                      path: Optional[str] = None, source: Optional[Dict[str, Any]] = None) -> None:
+        """Route each chunk of group to the shards its jurisdiction mask selects."""
+        placed: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self.shards}
+        for n, chunk in enumerate(chunks):
+            chunk = dict(chunk, id=chunk.get("id") or f"{group}#{n}")
+            mask = (chunk.get("meta") or {}).get("jurisdictions", 0)
+            targets = [name for name, bit in self.shard_bits.items() if mask & bit]
+            for name in targets or [self.GLOBAL_SHARD]:
+                placed[name].append(chunk)
+        with self.lock:
+            has_chunks = any(placed.values())
+            for name, shard in self.shards.items():
+                if placed[name]:
+                    shard.replace_group(group, placed[name], doc_type, path, source=source)
+                elif name == self.GLOBAL_SHARD and not has_chunks:
+                    # Keep the fingerprint of an empty file so it is not re-read
+                    shard.replace_group(group, [], doc_type, path, source=source)
+                else:
+                    shard.remove_group(group)
+
+    def remove_group(self, group: str) -> bool:
+        with self.lock:
+            removed = [shard.remove_group(group) for shard in self.shards.values()]
+            return any(removed)
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        for shard in self.shards.values():
+            doc = shard.get_document(doc_id)
+            if doc is not None:
+                return doc
+        return None
+
+    def tag_mask(self, doc_id: str) -> int:
+        """Bits of the shards holding doc_id."""
+        return sum(bit for name, bit in self.shard_bits.items() if doc_id in self.shards[name])
+
+    def group_mask(self, group: str) -> int:
+        """Bits of the shards holding any chunk of group (0 for unknown groups)."""
+        return sum(bit for name, bit in self.shard_bits.items() if self.shards[name].has_group(group))
+
+    def get_source(self, group: str) -> Optional[Dict[str, Any]]:
+        for shard in self.shards.values():
+            source = shard.get_source(group)
+            if source is not None:
+                return source
+        return None
+
+    def set_source(self, group: str, source: Dict[str, Any]) -> None:
+        with self.lock:
+            holders = [shard for shard in self.shards.values() if shard.get_source(group) is not None]
+            for shard in holders or [self.shards[self.GLOBAL_SHARD]]:
+                shard.set_source(group, source)
+
+    def sources(self) -> Dict[str, Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for shard in self.shards.values():
+            merged.update(shard.sources())
+        return merged
+
+    def search(self, query: str, top_k: int = 3, region: Optional[str] = None) -> List[Tuple[str, float]]:
+        return self.search_many([query], top_k, region)[0]
+
+    def search_many(self, queries: List[str], top_k: int = 3,
+                    region: Optional[str] = None) -> List[List[Tuple[str, float]]]:
+        """BM25F-rank a batch of queries over the shards selected by region."""
+        with self.lock:
+            names = self._shard_names_for(region)
+            shards = [self.shards[name] for name in names]
+            scorer = shards[0].scorer
+            union = _ShardUnion(shards, *self._union_stats(names))
+            batch_scores = scorer.score_many(union, [tokenize(q) for q in queries])
+        return [heapq.nlargest(top_k, scores.items(), key=lambda x: x[1]) for scores in batch_scores]
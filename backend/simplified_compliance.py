@@ -6,7 +6,7 @@ import logging
 from typing import List, Dict, Any, Optional
 from claude_client import get_claude_client
 from landingai_client import extract_fields
-from pathway_pipeline import hybrid_search
+from pathway_pipeline import hybrid_search_many
 
 logger = logging.getLogger(__name__)
 
@@ -67,29 +67,24 @@ class SimplifiedComplianceEngine:
         
         relevant_rules = []
         
-        for rule in claude_rules:
-            try:
-                # Search for this rule using Pathway
-                query = f"{rule.get('title', '')} {rule.get('description', '')} {region}"
-                pathway_results = hybrid_search(query, top_k=3)
-                
-                if pathway_results:
-                    # Rule is relevant if Pathway finds matches
-                    rule["pathway_relevance"] = True
-                    rule["pathway_score"] = pathway_results[0][1] if pathway_results else 0.0
-                    relevant_rules.append(rule)
-                else:
-                    # Still include rule but mark as low relevance
-                    rule["pathway_relevance"] = False
-                    rule["pathway_score"] = 0.0
-                    relevant_rules.append(rule)
-                    
-            except Exception as e:
-                logger.error(f"Error searching rule with Pathway: {e}")
-                # Include rule anyway
+        # Search for all of Claude's rules in a single batched Pathway round
+        queries = [f"{rule.get('title', '')} {rule.get('description', '')} {region}" for rule in claude_rules]
+        try:
+            batch_results = hybrid_search_many(queries, top_k=3) if queries else []
+        except Exception as e:
+            logger.error(f"Error searching rules with Pathway: {e}")
+            batch_results = [[] for _ in claude_rules]
+        
+        for rule, pathway_results in zip(claude_rules, batch_results):
+            if pathway_results:
+                # Rule is relevant if Pathway finds matches
+                rule["pathway_relevance"] = True
+                rule["pathway_score"] = pathway_results[0][1]
+            else:
+                # Still include rule but mark as low relevance
                 rule["pathway_relevance"] = False
                 rule["pathway_score"] = 0.0
-                relevant_rules.append(rule)
+            relevant_rules.append(rule)
         
         # Sort by Pathway relevance and score
         relevant_rules.sort(key=lambda x: (x.get("pathway_relevance", False), x.get("pathway_score", 0)), reverse=True)
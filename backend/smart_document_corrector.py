@@ -12,7 +12,7 @@ from landingai_client import extract_fields, extract_tables
 from pathway_pipeline import hybrid_search
 from retriever import retrieve
 from ai_compliance_checker import ai_compliance_checker
-from risk_correlation import risk_engine
+from analysis_context import AnalysisContext
 from claude_client import claude_client
 from dotenv import load_dotenv
 
@@ -59,21 +59,25 @@ class SmartDocumentCorrector:
             }
         }
     
-    def analyze_document_for_corrections(self, document_path: str, region: str) -> Dict[str, Any]:
+    def analyze_document_for_corrections(self, document_path: str, region: str,
+                                         context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """Analyze document and identify correction opportunities"""
         logger.info(f"Analyzing document for corrections: {document_path}")
+        # One context for the whole analysis so checkers share retrievals and correlations
+        context = context or AnalysisContext()
         
         # Step 1: Extract document structure using LandingAI ADE
         fields = extract_fields(document_path)
         tables = extract_tables(document_path)
         
-        # Step 2: Run compliance analysis
-        compliance_flags = ai_compliance_checker.check_compliance_ai(fields, region)
-        risk_correlations = risk_engine.analyze_cross_document_risks(fields, region)
+        # Step 2: Run compliance analysis (the checker's correlation pass is reused below)
+        compliance_flags, risk_correlations = ai_compliance_checker.check_compliance_with_correlations(
+            fields, region, context=context
+        )
         
         # Step 3: Identify correction opportunities
         correction_opportunities = self._identify_correction_opportunities(
-            fields, compliance_flags, risk_correlations, region
+            fields, compliance_flags, risk_correlations, region, context
         )
         
         return {
@@ -88,27 +92,29 @@ class SmartDocumentCorrector:
         }
     
     def _identify_correction_opportunities(self, fields: List, compliance_flags: List, 
-                                         risk_correlations: List, region: str) -> List[Dict[str, Any]]:
+                                         risk_correlations: List, region: str,
+                                         context: Optional[AnalysisContext] = None) -> List[Dict[str, Any]]:
         """Identify specific correction opportunities"""
         opportunities = []
         
         # Analyze compliance flags for correction opportunities
         for flag in compliance_flags:
             if flag.risk_level in ["HIGH", "MEDIUM"]:
-                correction = self._generate_correction_for_flag(flag, region)
+                correction = self._generate_correction_for_flag(flag, region, context)
                 if correction:
                     opportunities.append(correction)
         
         # Analyze risk correlations for correction opportunities
         for correlation in risk_correlations:
             if correlation.get("risk_level") in ["HIGH", "MEDIUM"]:
-                correction = self._generate_correction_for_correlation(correlation, region)
+                correction = self._generate_correction_for_correlation(correlation, region, context)
                 if correction:
                     opportunities.append(correction)
         
         return opportunities
     
-    def _generate_correction_for_flag(self, flag, region: str) -> Optional[Dict[str, Any]]:
+    def _generate_correction_for_flag(self, flag, region: str,
+                                      context: Optional[AnalysisContext] = None) -> Optional[Dict[str, Any]]:
         """Generate correction for a compliance flag using Claude AI"""
         category = flag.category
         risk_level = flag.risk_level
@@ -120,7 +126,7 @@ class SmartDocumentCorrector:
             return claude_correction
         
         # Fallback to rule-based correction
-        correction_rules = self._search_correction_rules(category, region)
+        correction_rules = self._search_correction_rules(category, region, context)
         
         if not correction_rules:
             return None
@@ -142,13 +148,14 @@ class SmartDocumentCorrector:
         
         return correction
     
-    def _generate_correction_for_correlation(self, correlation: Dict, region: str) -> Optional[Dict[str, Any]]:
+    def _generate_correction_for_correlation(self, correlation: Dict, region: str,
+                                             context: Optional[AnalysisContext] = None) -> Optional[Dict[str, Any]]:
         """Generate correction for a risk correlation"""
         correlation_type = correlation.get("correlation_type")
         risk_level = correlation.get("risk_level")
         
         # Search for correction rules using Pathway
-        correction_rules = self._search_correction_rules(correlation_type, region)
+        correction_rules = self._search_correction_rules(correlation_type, region, context)
         
         if not correction_rules:
             return None
@@ -168,12 +175,13 @@ class SmartDocumentCorrector:
         
         return correction
     
-    def _search_correction_rules(self, category: str, region: str) -> List[Dict[str, Any]]:
+    def _search_correction_rules(self, category: str, region: str,
+                                 context: Optional[AnalysisContext] = None) -> List[Dict[str, Any]]:
         """Search for correction rules using Pathway"""
         try:
-            # Use Pathway to search for correction rules
+            # Use Pathway to search for correction rules (once per category within a request)
             query = f"{category} correction template {region}"
-            results = hybrid_search(query, top_k=5)
+            results = context.search(query, top_k=5) if context is not None else hybrid_search(query, top_k=5)
             
             correction_rules = []
             for rule_text, score in results:
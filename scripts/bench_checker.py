@@ -0,0 +1,136 @@
+"""
+Benchmark checker.check (compiled field -> checks dispatch) against the
+previous category x field scan on synthetic contracts
+
+Run from the repository root:
+    python scripts/bench_checker.py --fields 500 --extra-checks 200
+Rule retrieval is warmed once through an AnalysisContext, so the timings
+cover only the check evaluation.
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import checker  # noqa: E402
+from analysis_context import AnalysisContext  # noqa: E402
+from models.schemas import ComplianceFlag, ContractField, Evidence  # noqa: E402
+
+
+def legacy_check(fields, region, context):
+    """checker.check before the rule table: every category x every field x inline rules."""
+    flags = []
+    for cat in checker.CATEGORIES:
+        hits = context.retrieve(cat, region, top_k=1)
+        if not hits:
+            continue
+        rule_text, _ = hits[0]
+        rule_evidence = Evidence(
+            file=getattr(hits[0], "source", None) or "rules_store",
+            section=getattr(hits[0], "section", None) or "top_hit",
+        )
+        for f in fields:
+            if cat == "privacy" and f.name == "data_processing":
+                risk = "LOW" if any(w in rule_text.lower() for w in ["controller", "processor"]) else "HIGH"
+                flags.append(ComplianceFlag(id=f"{cat}-{f.name}", category=cat, region=region, risk_level=risk,
+                                            rationale=f"Field '{f.name}' value '{f.value}' vs privacy rule snippet.",
+                                            contract_evidence=f.evidence, rule_evidence=rule_evidence))
+            if cat == "labor" and f.name == "termination_notice":
+                risk = "LOW" if any(x in f.value.lower() for x in ["30", "60"]) else "MED"
+                flags.append(ComplianceFlag(id=f"{cat}-{f.name}", category=cat, region=region, risk_level=risk,
+                                            rationale=f"Termination notice '{f.value}' vs labor rule.",
+                                            contract_evidence=f.evidence, rule_evidence=rule_evidence))
+            if cat == "tax" and f.name == "tax_withholding_clause":
+                risk = "LOW" if "applicable" in f.value.lower() else "HIGH"
+                flags.append(ComplianceFlag(id=f"{cat}-{f.name}", category=cat, region=region, risk_level=risk,
+                                            rationale=f"Tax withholding clause '{f.value}' vs tax rule.",
+                                            contract_evidence=f.evidence, rule_evidence=rule_evidence))
+    return flags
+
+
+def scan_check(fields, region, context, table):
+    """The same table evaluated as a category x field x rule scan (the shape being replaced)."""
+    flags = []
+    categories = list(dict.fromkeys(entry["category"] for entry in table))
+    for cat in categories:
+        hits = context.retrieve(cat, region, top_k=1)
+        if not hits:
+            continue
+        rule_lower = hits[0][0].lower()
+        rule_evidence = Evidence(file="rules_store", section="top_hit")
+        for f in fields:
+            for entry in table:
+                if entry["category"] != cat or entry["field"] != f.name:
+                    continue
+                subject = rule_lower if entry["match"] == "rule" else f.value.lower()
+                hit = any(k in subject for k in entry["any_of"])
+                flags.append(ComplianceFlag(id=f"{cat}-{f.name}", category=cat, region=region,
+                                            risk_level=entry["risk_if_match"] if hit else entry["risk_otherwise"],
+                                            rationale=entry["rationale"].format(field=f.name, value=f.value, category=cat),
+                                            contract_evidence=f.evidence, rule_evidence=rule_evidence))
+    return flags
+
+
+def make_fields(n, extra_names, rng):
+    names = ["data_processing", "termination_notice", "tax_withholding_clause"] + extra_names
+    values = ["30 days", "90 days", "as applicable", "not specified", "controller and processor"]
+    return [ContractField(name=rng.choice(names), value=rng.choice(values),
+                          evidence=Evidence(file="synthetic.json", page=i // 40 + 1))
+            for i in range(n)]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fields", type=int, default=500)
+    parser.add_argument("--extra-checks", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--region", default="EU")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    extra_categories = ["privacy", "labor", "tax"] + [f"category_{i}" for i in range(args.categories)]
+    extra = [{"field": f"clause_{i}", "category": rng.choice(extra_categories), "match": rng.choice(["rule", "value"]),
+              "any_of": ["shall", "days"], "risk_if_match": "LOW", "risk_otherwise": "MED",
+              "rationale": "Field '{field}' value '{value}' vs {category} rule."}
+             for i in range(args.extra_checks)]
+    table = checker.CHECKS + extra
+    fields = make_fields(args.fields, [f"clause_{i}" for i in range(args.extra_checks)], rng)
+
+    context = AnalysisContext()
+    for cat in set(extra_categories):
+        context.retrieve(cat, args.region, top_k=1)
+
+    assert ([f.model_dump() for f in checker.check(fields, args.region, context)]
+            == [f.model_dump() for f in legacy_check(fields, args.region, context)]), "built-in checks diverge"
+
+    print(f"{args.fields} fields, {len(table)} checks, {args.repeat} runs each (ms per call)")
+    print(f"  legacy hardcoded scan : {timed(lambda: legacy_check(fields, args.region, context), args.repeat):8.3f}")
+    print(f"  compiled, built-in    : {timed(lambda: checker.check(fields, args.region, context), args.repeat):8.3f}")
+
+    # Extra checks go through the same path as deployments: a JSON file in the checks directory
+    with tempfile.TemporaryDirectory() as checks_dir:
+        (Path(checks_dir) / "bench.json").write_text(json.dumps(extra), encoding="utf-8")
+        checker.CHECKS_DIR = Path(checks_dir)
+        flags = checker.check(fields, args.region, context)
+        assert ([(f.id, f.risk_level) for f in flags]
+                == [(f.id, f.risk_level) for f in scan_check(fields, args.region, context, table)]), "table checks diverge"
+        print(f"  table scan            : {timed(lambda: scan_check(fields, args.region, context, table), args.repeat):8.3f}")
+        print(f"  compiled, full table  : {timed(lambda: checker.check(fields, args.region, context), args.repeat):8.3f}"
+              f"  ({len(flags)} flags)")
+
+
+if __name__ == "__main__":
+    main()
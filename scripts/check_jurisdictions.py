@@ -0,0 +1,66 @@
+"""
+Regression check for jurisdiction tagging: sections inherit their file's
+regions, so a region search never returns chunks of a file tagged only for
+other regions (e.g. region='US' returns nothing from an EU-only rule file)
+
+Run from the repository root:
+    python scripts/check_jurisdictions.py
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import jurisdiction  # noqa: E402
+import pathway_pipeline  # noqa: E402
+
+QUERIES = [
+    "privacy gdpr personal data",
+    "data processing consent erasure",
+    "risk assessment requirements",
+    "documentation requirements",
+    "compliance timeline",
+    "termination notice period",
+    "security measures encryption",
+]
+
+
+def group_of(doc_id):
+    doc = pathway_pipeline._INDEX.get_document(doc_id) if doc_id else None
+    return doc["group"] if doc else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--region", default="US")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+    region_bit = jurisdiction.region_bit(args.region)
+
+    pathway_pipeline.build_index()
+    rules_dir = pathway_pipeline._find_rules_dir()
+    excluded = {}
+    for path in sorted(rules_dir.rglob("*.md")):
+        mask = jurisdiction.classify(path.read_text(encoding="utf-8", errors="ignore"))
+        if mask != jurisdiction.GLOBAL and not mask & region_bit:
+            excluded[pathway_pipeline._doc_id(path)] = path.name
+    print(f"{len(excluded)} rule files do not apply to {args.region}: {', '.join(sorted(excluded.values()))}")
+
+    # Every section of those files must stay out of the region (and global) shards
+    leaked = [doc_id for doc_id in pathway_pipeline._INDEX.doc_ids()
+              if group_of(doc_id) in excluded
+              and pathway_pipeline._INDEX.tag_mask(doc_id) & (region_bit | jurisdiction.GLOBAL)]
+    assert not leaked, f"sections tagged for {args.region} or GLOBAL: {leaked}"
+
+    for query in QUERIES:
+        hits = pathway_pipeline.hybrid_search(query, args.top_k, region=args.region)
+        bad = [f"{h.source} | {h.section}" for h in hits if group_of(h.chunk_id) in excluded
+               or (h.source and pathway_pipeline._doc_id(Path(h.source)) in excluded)]
+        assert not bad, f"region={args.region} {query!r} returned {bad}"
+        print(f"  {query!r}: {len(hits)} hits, none from excluded files")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+The search pipeline must import both as part of the backend package (MCP
+servers, agents) and as top-level modules from backend/ (uvicorn app:app)
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+
+def _import_ok(module: str, cwd: Path) -> None:
+    result = subprocess.run([sys.executable, "-c", f"import {module}"], cwd=cwd,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+
+
+def test_import_as_package():
+    _import_ok("backend.pathway_pipeline", ROOT)
+    _import_ok("backend.pathway_client", ROOT)
+
+
+def test_import_from_backend_dir():
+    _import_ok("pathway_pipeline", ROOT / "backend")
+
+
+if __name__ == "__main__":
+    test_import_as_package()
+    test_import_from_backend_dir()
+    print("Imports OK")